@@ -22,8 +22,10 @@ from sqlmodel import SQLModel
 from src.auth.models import User, OAuthAccount
 from src.users.models import Follow
 from src.videos.models import Video
-from src.user_interactions.models import Like
-from src.videos.models import VideoGenerationJob
+from src.user_interactions.models import Like, VideoCounterDelta
+from src.videos.models import VideoGenerationJob, GenerationQuotaUsage, ReferenceImage
+from src.feed.models import HomeTimelineEntry
+from src.events.models import OutboxMessage
 from src.config import get_settings
 
 settings = get_settings()
@@ -0,0 +1,31 @@
+"""add feed keyset index to videos
+
+Revision ID: 3b6e2f9c1a47
+Revises: 7d90b2e6f4a1
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b6e2f9c1a47"
+down_revision: Union[str, Sequence[str], None] = "7d90b2e6f4a1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_videos_status_created_at_id",
+        "videos",
+        ["status", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_videos_status_created_at_id", table_name="videos")
@@ -0,0 +1,50 @@
+"""add home timelines
+
+Revision ID: 5e0c8d41b7f2
+Revises: 3b6e2f9c1a47
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e0c8d41b7f2"
+down_revision: Union[str, Sequence[str], None] = "3b6e2f9c1a47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "home_timelines",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("video_id", sa.Integer(), nullable=False),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["video_id"], ["videos.id"]),
+        sa.ForeignKeyConstraint(["author_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "video_id"),
+    )
+    op.create_index(
+        "ix_home_timelines_user_created_at_video",
+        "home_timelines",
+        ["user_id", sa.text("created_at DESC"), sa.text("video_id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_home_timelines_user_author",
+        "home_timelines",
+        ["user_id", "author_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_home_timelines_user_author", table_name="home_timelines")
+    op.drop_index("ix_home_timelines_user_created_at_video", table_name="home_timelines")
+    op.drop_table("home_timelines")
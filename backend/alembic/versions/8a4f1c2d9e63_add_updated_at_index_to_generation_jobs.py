@@ -0,0 +1,31 @@
+"""add updated_at index to generation jobs
+
+Revision ID: 8a4f1c2d9e63
+Revises: 5e0c8d41b7f2
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8a4f1c2d9e63"
+down_revision: Union[str, Sequence[str], None] = "5e0c8d41b7f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_video_generation_jobs_updated_at"),
+        "video_generation_jobs",
+        ["updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_video_generation_jobs_updated_at"), table_name="video_generation_jobs")
@@ -0,0 +1,48 @@
+"""add generation quota usage
+
+Revision ID: a6d2c8e4f917
+Revises: f3a8d6b1c274
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a6d2c8e4f917"
+down_revision: Union[str, Sequence[str], None] = "f3a8d6b1c274"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("tier", sa.String(), server_default="free", nullable=False),
+    )
+    op.create_table(
+        "generation_quota_usage",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("used", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+    # carry over today's generations so nobody gets a fresh quota mid-day
+    op.execute(
+        """
+        INSERT INTO generation_quota_usage (user_id, day, used)
+        SELECT user_id, (now() AT TIME ZONE 'UTC')::date, count(*)
+        FROM video_generation_jobs
+        WHERE created_at >= date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("generation_quota_usage")
+    op.drop_column("users", "tier")
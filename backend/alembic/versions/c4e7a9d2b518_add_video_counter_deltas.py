@@ -0,0 +1,42 @@
+"""add video counter deltas
+
+Revision ID: c4e7a9d2b518
+Revises: 8a4f1c2d9e63
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e7a9d2b518"
+down_revision: Union[str, Sequence[str], None] = "8a4f1c2d9e63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "video_counter_deltas",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("video_id", sa.Integer(), nullable=False),
+        sa.Column("likes_delta", sa.Integer(), nullable=False),
+        sa.Column("comments_delta", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["video_id"], ["videos.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_video_counter_deltas_video_id"),
+        "video_counter_deltas",
+        ["video_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_video_counter_deltas_video_id"), table_name="video_counter_deltas")
+    op.drop_table("video_counter_deltas")
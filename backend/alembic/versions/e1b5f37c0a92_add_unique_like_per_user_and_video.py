@@ -0,0 +1,62 @@
+"""add unique like per user and video
+
+Revision ID: e1b5f37c0a92
+Revises: c4e7a9d2b518
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1b5f37c0a92"
+down_revision: Union[str, Sequence[str], None] = "c4e7a9d2b518"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicate likes from the old SELECT-then-INSERT race each bumped the
+    # counter; take the surplus back off, then drop all but the first row.
+    op.execute(
+        """
+        UPDATE videos
+        SET likes_count = GREATEST(videos.likes_count - surplus.n, 0)
+        FROM (
+            SELECT video_id, count(*) - count(DISTINCT user_id) AS n
+            FROM likes
+            GROUP BY video_id
+            HAVING count(*) > count(DISTINCT user_id)
+        ) surplus
+        WHERE videos.id = surplus.video_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM likes
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY user_id, video_id ORDER BY id
+                ) AS n
+                FROM likes
+            ) ranked
+            WHERE n > 1
+        )
+        """
+    )
+    op.create_index(
+        "uq_likes_user_id_video_id",
+        "likes",
+        ["user_id", "video_id"],
+        unique=True,
+    )
+    op.drop_index(op.f("ix_likes_user_id"), table_name="likes")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_likes_user_id"), "likes", ["user_id"], unique=False)
+    op.drop_index("uq_likes_user_id_video_id", table_name="likes")
@@ -0,0 +1,56 @@
+"""add generation job claims
+
+Revision ID: e8c4a1f6b352
+Revises: d5f2b8c3e916
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8c4a1f6b352"
+down_revision: Union[str, Sequence[str], None] = "d5f2b8c3e916"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("video_generation_jobs", sa.Column("worker_id", sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column("video_generation_jobs", sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column(
+        "video_generation_jobs",
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+    )
+    # jobs already RUNNING were marked without a lease; give them an hour
+    # from their last update before the reaper considers them lost
+    op.execute(
+        """
+        UPDATE video_generation_jobs
+        SET lease_expires_at = updated_at + interval '1 hour',
+            attempts = 1
+        WHERE status = 'RUNNING'
+        """
+    )
+    op.create_index(
+        "ix_video_generation_jobs_running_lease",
+        "video_generation_jobs",
+        ["lease_expires_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'RUNNING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_video_generation_jobs_running_lease",
+        table_name="video_generation_jobs",
+        postgresql_where=sa.text("status = 'RUNNING'"),
+    )
+    op.drop_column("video_generation_jobs", "attempts")
+    op.drop_column("video_generation_jobs", "lease_expires_at")
+    op.drop_column("video_generation_jobs", "worker_id")
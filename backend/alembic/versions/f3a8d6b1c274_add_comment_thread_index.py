@@ -0,0 +1,34 @@
+"""add comment thread index
+
+Revision ID: f3a8d6b1c274
+Revises: e1b5f37c0a92
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a8d6b1c274"
+down_revision: Union[str, Sequence[str], None] = "e1b5f37c0a92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_comments_video_parent_created_at_id",
+        "comments",
+        ["video_id", "parent_comment_id", "created_at", "id"],
+        unique=False,
+    )
+    # covered by the leading column above
+    op.drop_index(op.f("ix_comments_video_id"), table_name="comments")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_comments_video_id"), "comments", ["video_id"], unique=False)
+    op.drop_index("ix_comments_video_parent_created_at_id", table_name="comments")
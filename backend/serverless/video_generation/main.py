@@ -13,32 +13,65 @@ PROJECT_ID = os.environ.get("PROJECT_ID", "genvidgcp")
 REGION = os.environ["REGION"]
 GPU_JOB_NAME = os.environ["GPU_JOB_NAME"]
 
+# Must match src.events.broker.JOB_STATUS_CHANNEL in the API.
+JOB_STATUS_CHANNEL = "video_generation_job_status"
 
-def update_job_status(job_id, status, error_message=None):
+NOTIFY_UPDATED = f"""
+    SELECT pg_notify(
+        '{JOB_STATUS_CHANNEL}',
+        json_build_object('id', id, 'user_id', user_id)::text
+    )
+    FROM updated
+"""
+
+
+def get_job_status(job_id):
+    conn = psycopg2.connect(DATABASE_URL)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT status FROM video_generation_jobs WHERE id=%s", (job_id,))
+            row = cur.fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def update_job_status(job_id, status, error_message=None, expected_status=None):
+    """Sets the job's status; with ``expected_status``, only if the job is
+    still in that status."""
     conn = psycopg2.connect(DATABASE_URL)
     cur = conn.cursor()
 
+    guard = " AND status=%s" if expected_status else ""
+    guard_params = (expected_status,) if expected_status else ()
+
     try:
         if error_message:
             cur.execute(
                 """
-                UPDATE video_generation_jobs
-                SET status=%s,
-                    error_message=%s,
-                    updated_at=NOW()
-                WHERE id=%s
-                """,
-                (status, error_message, job_id),
+                WITH updated AS (
+                    UPDATE video_generation_jobs
+                    SET status=%s,
+                        error_message=%s,
+                        updated_at=NOW()
+                    WHERE id=%s""" + guard + """
+                    RETURNING id, user_id
+                )
+                """ + NOTIFY_UPDATED,
+                (status, error_message, job_id, *guard_params),
             )
         else:
             cur.execute(
                 """
-                UPDATE video_generation_jobs
-                SET status=%s,
-                    updated_at=NOW()
-                WHERE id=%s
-                """,
-                (status, job_id),
+                WITH updated AS (
+                    UPDATE video_generation_jobs
+                    SET status=%s,
+                        updated_at=NOW()
+                    WHERE id=%s""" + guard + """
+                    RETURNING id, user_id
+                )
+                """ + NOTIFY_UPDATED,
+                (status, job_id, *guard_params),
             )
 
         conn.commit()
@@ -83,10 +116,16 @@ def handle_pubsub(event, context):
 
         job_id = payload["job_id"]
 
-        logging.info(f"Dispatching job {job_id}")
+        # The worker claims the job (QUEUED -> RUNNING) itself, so a
+        # redelivered message cannot start a second paid generation; skip
+        # jobs that are already claimed or finished without starting a
+        # container at all.
+        status = get_job_status(job_id)
+        if status != "QUEUED":
+            logging.info(f"Job {job_id} is {status}, not dispatching again")
+            return
 
-        # Mark RUNNING before triggering
-        update_job_status(job_id, "RUNNING")
+        logging.info(f"Dispatching job {job_id}")
 
         trigger_gpu_job(payload)
 
@@ -95,6 +134,7 @@ def handle_pubsub(event, context):
     except Exception as e:
         logging.error(traceback.format_exc())
         try:
-            update_job_status(payload.get("job_id"), "FAILED", error_message=str(e))
+            # a worker may have claimed the job meanwhile; leave it alone then
+            update_job_status(payload.get("job_id"), "FAILED", error_message=str(e), expected_status="QUEUED")
         except Exception:
             logging.error("Failed to mark job as FAILED")
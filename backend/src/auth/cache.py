@@ -0,0 +1,142 @@
+"""Short-lived cache of authenticated users, so ``get_current_user`` does not
+select from ``users`` on every request.
+
+Entries expire after ``USER_CACHE_TTL_SECONDS`` and are dropped explicitly
+when a user's row changes. With the in-memory backend other API instances
+only see a change once their entry expires; use the Redis backend when that
+window matters.
+"""
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.models import User
+from src.config import get_settings
+
+# never leaves the database; loaded lazily if something asks for it
+UNCACHED_FIELDS = {"hashed_password"}
+
+
+class UserCache(ABC):
+    @abstractmethod
+    def get(self, user_id: int) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def set(self, user_id: int, data: dict) -> None:
+        pass
+
+    @abstractmethod
+    def invalidate(self, user_id: int) -> None:
+        pass
+
+
+class InMemoryUserCache(UserCache):
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return data
+
+    def set(self, user_id, data):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, data)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+class RedisUserCache(UserCache):
+    def __init__(self, client, ttl_seconds: int):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    def get(self, user_id):
+        raw = self.client.get(self._key(user_id))
+        return json.loads(raw) if raw else None
+
+    def set(self, user_id, data):
+        self.client.setex(self._key(user_id), self.ttl_seconds, json.dumps(data))
+
+    def invalidate(self, user_id):
+        self.client.delete(self._key(user_id))
+
+
+_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> UserCache:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        if settings.USER_CACHE_BACKEND.lower() == "redis":
+            from src.redis_client import get_redis
+
+            _cache = RedisUserCache(get_redis(), settings.USER_CACHE_TTL_SECONDS)
+        else:
+            _cache = InMemoryUserCache(settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def cache_user(user: User) -> None:
+    get_user_cache().set(user.id, user.model_dump(mode="json", exclude=UNCACHED_FIELDS))
+
+
+def invalidate_user(user_id: int) -> None:
+    get_user_cache().invalidate(user_id)
+
+
+def _detached_user(user_id: int) -> Optional[User]:
+    data = get_user_cache().get(user_id)
+    if data is None:
+        return None
+    user = User.model_validate(data)
+    make_transient_to_detached(user)
+    return user
+
+
+def get_cached_user(session: Session, user_id: int) -> Optional[User]:
+    """Returns the cached user attached to ``session`` without a query, so the
+    caller can modify and commit it like a freshly loaded row."""
+    user = _detached_user(user_id)
+    if user is None:
+        return None
+    user = session.merge(user, load=False)
+    session.expire(user, list(UNCACHED_FIELDS))
+    return user
+
+
+async def get_cached_user_async(session: AsyncSession, user_id: int) -> Optional[User]:
+    user = _detached_user(user_id)
+    if user is None:
+        return None
+    user = await session.merge(user, load=False)
+    session.expire(user, list(UNCACHED_FIELDS))
+    return user
@@ -16,6 +16,8 @@ class User(SQLModel, table=True):
     hashed_password: Optional[str] = None
     profile_pic: Optional[str] = None
     bio: Optional[str] = None
+    # key into GENERATION_TIER_LIMITS
+    tier: str = Field(default="free", sa_column_kwargs={"server_default": "free"})
 
     created_at: datetime = Field(
         default_factory=utcnow,
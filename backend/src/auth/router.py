@@ -8,6 +8,7 @@ from src.auth.schema import SignupSchema, TokenSchema
 from src.auth.password import hash_password, verify_password
 from src.security import create_access_token
 from src.auth.utils import get_current_user
+from src.auth.cache import invalidate_user
 from src.auth.google_oauth import google
 from src.config import get_settings
 
@@ -31,6 +32,7 @@ def signup(data: SignupSchema, session: Session = Depends(get_session)):
     session.commit()
     session.refresh(user)
 
+    invalidate_user(user.id)
     token = create_access_token(subject=str(user.id))
     return {"access_token": token}
 
@@ -51,6 +53,7 @@ def login_for_access_token(
     if not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Incorrect credentials")
 
+    invalidate_user(user.id)
     token = create_access_token(subject=str(user.id))
     return {"access_token": token}
 
@@ -93,6 +96,7 @@ async def google_callback(request: Request, session: Session = Depends(get_sessi
         session.add(oauth)
 
     session.commit()
+    invalidate_user(user.id)
 
     jwt_token = create_access_token(subject=str(user.id))
     return {"access_token": jwt_token}
@@ -10,3 +10,7 @@ class SignupSchema(BaseModel):
 class TokenSchema(BaseModel):
     access_token: str
     token_type: str = "bearer"
+
+
+class TokenClaims(BaseModel):
+    id: int
@@ -1,26 +1,37 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timezone
 import jwt
 
-from src.db import get_session
+from src.db import get_async_session, get_session
 from src.auth.models import User
+from src.auth.cache import cache_user, get_cached_user, get_cached_user_async
+from src.auth.schema import TokenClaims
 from src.security import decode_token
 
 security = HTTPBearer()
 
 
+def _user_id_from_token(token: str) -> int:
+    try:
+        payload = decode_token(token)
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    return int(payload["sub"])
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: Session = Depends(get_session),
 ):
-    try:
-        payload = decode_token(credentials.credentials)
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    user_id = _user_id_from_token(credentials.credentials)
 
-    user_id = int(payload["sub"])
+    user = get_cached_user(session, user_id)
+    if user:
+        return user
 
     statement = select(User).where(User.id == user_id)
     user = session.exec(statement).first()
@@ -28,4 +39,36 @@ def get_current_user(
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
-    return user
\ No newline at end of file
+    cache_user(user)
+    return user
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: AsyncSession = Depends(get_async_session),
+):
+    user_id = _user_id_from_token(credentials.credentials)
+
+    user = await get_cached_user_async(session, user_id)
+    if user:
+        return user
+
+    statement = select(User).where(User.id == user_id)
+    user = (await session.exec(statement)).first()
+
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    cache_user(user)
+    return user
+
+
+async def get_current_user_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> TokenClaims:
+    """Token-only authentication for endpoints that just need the user id.
+
+    Does not check that the user still exists; use ``get_current_user`` where
+    that matters.
+    """
+    return TokenClaims(id=_user_id_from_token(credentials.credentials))
@@ -1,6 +1,7 @@
 # src/config.py
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -15,6 +16,21 @@ class Settings(BaseSettings):
     JWT_EXP_MINUTES: int 
 
     DATABASE_URL: str
+    # unset: log SQL only when ENV is development
+    DB_ECHO: Optional[bool] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+
+    # empty: every read goes to DATABASE_URL
+    DATABASE_READ_REPLICA_URL: str = ""
+    READ_REPLICA_MAX_LAG_SECONDS: float = 2.0
+    READ_REPLICA_LAG_CHECK_SECONDS: float = 5.0
+    # a user's reads go to the primary for this long after they write;
+    # "memory" or "redis" (shared across instances)
+    READ_YOUR_WRITES_SECONDS: float = 10.0
+    READ_YOUR_WRITES_BACKEND: str = "memory"
 
     SERVICE_URL: str
 
@@ -24,6 +40,82 @@ class Settings(BaseSettings):
     GCP_PROJECT_ID: str
     GCP_PUBSUB_VIDEO_GEN_TOPIC: str
     SA_KEY_PATH: str
+    # connections shared by the storage client, token refreshes and signBlob
+    GCP_HTTP_POOL_SIZE: int = 32
+
+    # "iam" signs V4 strings via signBlob, "secret_manager" signs locally with a
+    # key from Secret Manager, "legacy" keeps the per-call storage client path.
+    GCS_SIGNING_BACKEND: str = "iam"
+    GCS_SIGNING_SERVICE_ACCOUNT: str = "286573941342-compute@developer.gserviceaccount.com"
+    GCS_SIGNING_KEY_SECRET: str = ""
+    GCS_SIGNING_KEY_REFRESH_SECONDS: int = 3600
+    GCS_SIGNING_MAX_WORKERS: int = 8
+    # concurrent reference-image uploads per API process
+    REFERENCE_UPLOAD_MAX_WORKERS: int = 8
+    # a stored reference image is reused for this long after its upload;
+    # must stay well under the 2-day lifecycle rule on references/
+    REFERENCE_IMAGE_REUSE_SECONDS: int = 24 * 3600
+
+    SIGNED_URL_CACHE_MAX_ENTRIES: int = 10000
+    SIGNED_URL_CACHE_HEADROOM_RATIO: float = 0.5
+
+    REDIS_URL: str = ""
+
+    # mounts the asyncpg-backed routers under /async
+    ASYNC_ROUTES_ENABLED: bool = True
+
+    # "memory" or "redis"
+    USER_CACHE_BACKEND: str = "memory"
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # daily video generations per users.tier; unknown tiers get "free"
+    GENERATION_TIER_LIMITS: dict[str, int] = {"free": 2}
+    # how long an over-quota user is rejected without asking the database
+    GENERATION_QUOTA_REJECTION_CACHE_SECONDS: int = 300
+
+    # how often each API instance folds pending like/comment deltas into
+    # videos; 0 leaves it to `python -m src.user_interactions.counters`
+    COUNTER_FLUSH_INTERVAL_SECONDS: float = 1.0
+    COUNTER_FLUSH_BATCH_SIZE: int = 5000
+
+    # how often each API instance publishes pending outbox messages (commits
+    # also wake it); 0 leaves it to `python -m src.events.outbox`
+    OUTBOX_RELAY_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_PUBLISH_TIMEOUT_SECONDS: float = 30.0
+    OUTBOX_RETRY_BASE_SECONDS: float = 1.0
+    OUTBOX_RETRY_MAX_SECONDS: float = 300.0
+    # "pubsub", or "memory" to keep messages in-process (tests, local runs);
+    # with PUBSUB_EMULATOR_HOST set in the environment "pubsub" talks to the
+    # emulator instead
+    OUTBOX_BROKER: str = "pubsub"
+
+    # Pub/Sub client batching: a batch is sent once it holds this many
+    # messages or bytes, or its first message is this old
+    PUBSUB_BATCH_MAX_MESSAGES: int = 100
+    PUBSUB_BATCH_MAX_BYTES: int = 1_000_000
+    PUBSUB_BATCH_MAX_LATENCY_SECONDS: float = 0.01
+    # unconfirmed messages allowed per process before publish() applies
+    # PUBSUB_FLOW_CONTROL_BEHAVIOR: "block", "error" or "ignore"
+    PUBSUB_FLOW_CONTROL_MAX_MESSAGES: int = 1000
+    PUBSUB_FLOW_CONTROL_MAX_BYTES: int = 10_000_000
+    PUBSUB_FLOW_CONTROL_BEHAVIOR: str = "block"
+
+    # "notify" uses LISTEN/NOTIFY, "poll" one shared updated_at poller
+    EVENTS_BACKEND: str = "notify"
+    EVENTS_POLL_INTERVAL_SECONDS: float = 3.0
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+    EVENTS_SNAPSHOT_LIMIT: int = 50
+    EVENTS_REPLAY_BUFFER_SIZE: int = 100
+    EVENTS_REPLAY_WINDOW_SECONDS: int = 120
+
+    # "postgres" or "redis"
+    TIMELINE_BACKEND: str = "postgres"
+    TIMELINE_FANOUT_MAX_FOLLOWERS: int = 10000
+    TIMELINE_BACKFILL_LIMIT: int = 100
+    TIMELINE_MAX_ENTRIES: int = 1000
+    TIMELINE_CELEBRITY_CACHE_SECONDS: int = 300
 
     class Config:
         env_file = ".env"
@@ -1,20 +1,122 @@
 # src/db.py
+from typing import Optional
+
+import jwt
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.config import get_settings
+from src.pool_metrics import instrumented_pool_class, register_pool_gauges
+from src.read_replica import ReadSession, ReplicaLagMonitor, register_lag_gauge
+from src.security import decode_token
 
 settings = get_settings()
 
+
+def _engine_options() -> dict:
+    # Each process holds up to pool_size + max_overflow connections per
+    # engine; size against the Cloud SQL connection limit divided by the
+    # maximum number of instances.
+    echo = settings.DB_ECHO
+    if echo is None:
+        echo = settings.ENV.lower() == "development"
+    return {
+        "echo": echo,
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=True,
-    pool_pre_ping=True,
+    poolclass=instrumented_pool_class(QueuePool, "db"),
+    **_engine_options(),
+)
+register_pool_gauges("db", engine)
+
+
+replica_engine = None
+replica_monitor: Optional[ReplicaLagMonitor] = None
+if settings.DATABASE_READ_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_READ_REPLICA_URL,
+        poolclass=instrumented_pool_class(QueuePool, "db_replica"),
+        **_engine_options(),
+    )
+    register_pool_gauges("db_replica", replica_engine)
+    replica_monitor = ReplicaLagMonitor(
+        replica_engine,
+        max_lag_seconds=settings.READ_REPLICA_MAX_LAG_SECONDS,
+        check_interval=settings.READ_REPLICA_LAG_CHECK_SECONDS,
+    )
+    register_lag_gauge(replica_monitor)
+
+
+def async_database_url(database_url: str) -> str:
+    """``DATABASE_URL`` rewritten for the asyncpg driver."""
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+    query = dict(url.query)
+    # asyncpg takes ``ssl`` instead of libpq's ``sslmode``
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(query=query).render_as_string(hide_password=False)
+
+
+# Used by the async routers mounted under /async; the sync engine above keeps
+# serving the threadpool routers so both paths can be compared side by side.
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, "db_async"),
+    **_engine_options(),
 )
+register_pool_gauges("db_async", async_engine.sync_engine)
 
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
 
-def get_session():
+def request_user_id(request: Request) -> Optional[int]:
+    """The bearer token's user, if any; only used to route reads, never to
+    authorize anything."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        token = request.query_params.get("token")
+    if not token:
+        return None
+    try:
+        return int(decode_token(token)["sub"])
+    except (jwt.InvalidTokenError, KeyError, ValueError):
+        return None
+
+
+def read_session(user_id: Optional[int] = None) -> Session:
+    """A session for read-only work, on the replica when one is configured
+    and ``user_id`` has not written recently."""
+    if replica_engine is None:
+        return Session(engine)
+    return ReadSession(engine, replica_engine, replica_monitor, user_id=user_id)
+
+
+def get_session(request: Request):
     with Session(engine) as session:
+        # lets a commit mark the user for read-your-writes routing
+        session.info["user_id"] = request_user_id(request)
+        yield session
+
+
+def get_read_session(request: Request):
+    with read_session(request_user_id(request)) as session:
+        yield session
+
+
+async def get_async_session(request: Request):
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        session.info["user_id"] = request_user_id(request)
         yield session
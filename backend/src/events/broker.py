@@ -0,0 +1,359 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import Optional
+
+import asyncpg
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, func, text
+from sqlalchemy.engine import make_url
+from sqlmodel import Session, select
+
+from src.config import get_settings
+from src.db import engine, read_session
+from src.videos.enums import GenerationStatus
+from src.videos.models import VideoGenerationJob
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUS_CHANNEL = "video_generation_job_status"
+
+# Pushed to a subscriber queue when it may have missed events (queue overflow
+# or a lost listener connection); the stream reloads its snapshot.
+RESYNC = object()
+
+
+def serialize_job(job: VideoGenerationJob) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "prompt": job.prompt,
+        "reference_image_paths": job.reference_image_paths or [],
+        "preview_video_path": job.preview_video_path,
+        "preview_thumbnail_path": job.preview_thumbnail_path,
+        "error_message": job.error_message,
+        "published_video_id": job.published_video_id,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+
+def notify_job_status(session: Session, job: VideoGenerationJob) -> None:
+    """Queues a NOTIFY for ``job``; Postgres delivers it when the transaction
+    commits, so listeners never see uncommitted state."""
+    session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {
+            "channel": JOB_STATUS_CHANNEL,
+            "payload": json.dumps({"id": job.id, "user_id": job.user_id}),
+        },
+    )
+
+
+def load_job(job_id: int) -> Optional[dict]:
+    # primary: a replica may not have replayed the change being notified yet
+    with Session(engine) as session:
+        job = session.get(VideoGenerationJob, job_id)
+        return serialize_job(job) if job else None
+
+
+def load_user_jobs(user_id: int, limit: int) -> list[dict]:
+    """Active jobs first, then the most recently updated ones, up to ``limit``."""
+    active = VideoGenerationJob.status.in_([GenerationStatus.QUEUED, GenerationStatus.RUNNING])
+    with read_session(user_id) as session:
+        jobs = session.exec(
+            select(VideoGenerationJob)
+            .where(VideoGenerationJob.user_id == user_id)
+            .order_by(case((active, 0), else_=1), VideoGenerationJob.updated_at.desc())
+            .limit(limit)
+        ).all()
+        return [serialize_job(j) for j in jobs]
+
+
+def load_changed_jobs(user_ids: list[int], since: datetime) -> tuple[list[tuple[int, datetime, dict]], datetime]:
+    """Jobs of ``user_ids`` updated after ``since``, plus the database clock.
+
+    Stays on the primary: on a lagging replica rows could become visible
+    after the poll window has already moved past them.
+    """
+    with Session(engine) as session:
+        db_now = session.exec(select(func.now())).one()
+        jobs = session.exec(
+            select(VideoGenerationJob)
+            .where(
+                VideoGenerationJob.updated_at > since,
+                VideoGenerationJob.user_id.in_(user_ids),
+            )
+            .order_by(VideoGenerationJob.updated_at)
+        ).all()
+        return [(j.user_id, j.updated_at, serialize_job(j)) for j in jobs], db_now
+
+
+def _asyncpg_dsn(database_url: str) -> str:
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class _UserEventLog:
+    """Bounded ring of a user's recent events for ``Last-Event-ID`` replay.
+
+    ``floor`` is the newest sequence number that is *not* in the ring: a client
+    whose last seen event is at or after it can be replayed exactly.
+    """
+
+    def __init__(self, size: int, floor: int):
+        self.events: deque[tuple[int, dict]] = deque(maxlen=size)
+        self.floor = floor
+        self.last_active = time.monotonic()
+
+    def append(self, seq: int, event: dict) -> None:
+        if len(self.events) == self.events.maxlen:
+            self.floor = self.events[0][0]
+        self.events.append((seq, event))
+
+    def since(self, seq: int) -> Optional[list[tuple[int, dict]]]:
+        if seq < self.floor:
+            return None
+        return [(s, e) for s, e in self.events if s > seq]
+
+
+class JobEventBroker:
+    """One LISTEN connection per API process, fanned out to per-user queues.
+
+    A notification costs at most one primary-key lookup, and only when the
+    job's owner has an open stream (or had one within the replay window);
+    idle streams cost no queries at all.
+
+    Events are numbered ``"{boot_id}-{seq}"`` so a client reconnecting to a
+    different process is detected and sent a fresh snapshot instead.
+
+    With ``backend="poll"`` (for poolers without LISTEN/NOTIFY) a single task
+    per process runs one ``updated_at > last_seen`` query per tick for all
+    tracked users instead, so cost follows the change rate, not the number of
+    open streams.
+    """
+
+    def __init__(
+        self,
+        backend: str = "notify",
+        queue_size: int = 100,
+        reconnect_delay: float = 2.0,
+        replay_size: int = 100,
+        replay_window_seconds: float = 120.0,
+        poll_interval: float = 3.0,
+        poll_overlap_seconds: float = 5.0,
+    ):
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.poll_overlap = timedelta(seconds=poll_overlap_seconds)
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.replay_size = replay_size
+        self.replay_window_seconds = replay_window_seconds
+        self.boot_id = uuid.uuid4().hex[:8]
+        self._seq = itertools.count(1)
+        self._last_seq = 0
+        self._subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self._logs: dict[int, _UserEventLog] = {}
+        self._task: Optional[asyncio.Task] = None
+        # the loop only keeps weak references to tasks
+        self._dispatches: set[asyncio.Task] = set()
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.boot_id}-{seq}"
+
+    def current_event_id(self) -> str:
+        return self.event_id(self._last_seq)
+
+    def _parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        if not event_id:
+            return None
+        boot_id, _, seq = event_id.partition("-")
+        if boot_id != self.boot_id or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        self._prune_logs()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        if user_id not in self._logs:
+            self._logs[user_id] = _UserEventLog(self.replay_size, floor=self._last_seq)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+            log = self._logs.get(user_id)
+            if log is not None:
+                log.last_active = time.monotonic()
+
+    def replay(self, user_id: int, last_event_id: Optional[str]) -> Optional[list[tuple[str, dict]]]:
+        """Events the client missed since ``last_event_id``, or ``None`` when
+        they cannot be reconstructed and a snapshot is needed."""
+        seq = self._parse_event_id(last_event_id)
+        log = self._logs.get(user_id)
+        if seq is None or log is None:
+            return None
+        missed = log.since(seq)
+        if missed is None:
+            return None
+        return [(self.event_id(s), e) for s, e in missed]
+
+    def _prune_logs(self) -> None:
+        cutoff = time.monotonic() - self.replay_window_seconds
+        for user_id, log in list(self._logs.items()):
+            if user_id not in self._subscribers and log.last_active < cutoff:
+                del self._logs[user_id]
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self._subscribers
+
+    def is_tracking(self, user_id: int) -> bool:
+        if user_id in self._subscribers:
+            return True
+        log = self._logs.get(user_id)
+        return log is not None and time.monotonic() - log.last_active < self.replay_window_seconds
+
+    def subscribed_user_ids(self) -> list[int]:
+        return list(self._subscribers)
+
+    def tracked_user_ids(self) -> list[int]:
+        return [user_id for user_id in set(self._subscribers) | set(self._logs) if self.is_tracking(user_id)]
+
+    def publish_job(self, user_id: int, job: dict) -> None:
+        seq = next(self._seq)
+        self._last_seq = seq
+        log = self._logs.get(user_id)
+        if log is not None:
+            log.append(seq, job)
+        self.publish(user_id, (self.event_id(seq), job))
+
+    def publish(self, user_id: int, event) -> None:
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # the client fell behind; drop its backlog and make it resync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+    def resync_all(self) -> None:
+        # the ring buffers may have gaps now, so no replay across this point
+        self._logs.clear()
+        for user_id in list(self._subscribers):
+            self._logs[user_id] = _UserEventLog(self.replay_size, floor=self._last_seq)
+            self.publish(user_id, RESYNC)
+
+    async def start(self) -> None:
+        if self._task is None:
+            run = self._poll if self.backend == "poll" else self._listen
+            self._task = asyncio.create_task(run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._dispatches):
+            task.cancel()
+        await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    async def _listen(self) -> None:
+        dsn = _asyncpg_dsn(get_settings().DATABASE_URL)
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: closed.set())
+                await conn.add_listener(JOB_STATUS_CHANNEL, self._on_notify)
+                logger.info("Listening for job status notifications")
+                # anything that changed while we were not listening
+                self.resync_all()
+                await closed.wait()
+                logger.warning("Job status listener connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job status listener failed")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _poll(self) -> None:
+        # Rows are re-read for a short overlap because updated_at is stamped at
+        # transaction start and may become visible after a later tick; the
+        # id -> updated_at memo drops the repeats.
+        last_seen: Optional[datetime] = None
+        delivered: dict[int, datetime] = {}
+        logger.info("Polling for job status changes every %ss", self.poll_interval)
+        while True:
+            try:
+                user_ids = self.tracked_user_ids()
+                if not user_ids:
+                    # nobody is listening; new streams start from a snapshot
+                    last_seen = None
+                    delivered.clear()
+                else:
+                    since = (last_seen or datetime.now(timezone.utc)) - self.poll_overlap
+                    changed, db_now = await asyncio.to_thread(load_changed_jobs, user_ids, since)
+                    for user_id, updated_at, job in changed:
+                        if delivered.get(job["id"]) != updated_at:
+                            delivered[job["id"]] = updated_at
+                            self.publish_job(user_id, job)
+                    last_seen = db_now
+                    cutoff = db_now - self.poll_overlap
+                    delivered = {k: v for k, v in delivered.items() if v >= cutoff}
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job status poll failed")
+            await asyncio.sleep(self.poll_interval)
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            job_id, user_id = int(data["id"]), int(data["user_id"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed job status notification: %s", payload)
+            return
+        if self.is_tracking(user_id):
+            task = asyncio.create_task(self._dispatch(job_id, user_id))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatch_done)
+
+    def _dispatch_done(self, task: asyncio.Task) -> None:
+        self._dispatches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Job status dispatch failed", exc_info=task.exception())
+
+    async def _dispatch(self, job_id: int, user_id: int) -> None:
+        try:
+            job = await asyncio.to_thread(load_job, job_id)
+        except Exception:
+            logger.exception("Failed to load job %s for notification", job_id)
+            self.publish(user_id, RESYNC)
+            return
+        if job is not None:
+            self.publish_job(user_id, job)
+
+
+_settings = get_settings()
+broker = JobEventBroker(
+    backend=_settings.EVENTS_BACKEND.lower(),
+    poll_interval=_settings.EVENTS_POLL_INTERVAL_SECONDS,
+    replay_size=_settings.EVENTS_REPLAY_BUFFER_SIZE,
+    replay_window_seconds=_settings.EVENTS_REPLAY_WINDOW_SECONDS,
+)
@@ -0,0 +1,45 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+import sqlalchemy as sa
+
+from src.datetime_utils import utcnow
+
+
+class OutboxMessage(SQLModel, table=True):
+    """A message to publish once the transaction that wrote it commits.
+
+    Written next to the rows it describes, so a crash or a broker outage can
+    delay a message but never lose it; the outbox relay publishes and deletes
+    it.
+    """
+
+    __tablename__ = "outbox_messages"
+
+    id: Optional[int] = Field(
+        default=None,
+        primary_key=True,
+        sa_type=sa.BigInteger,
+    )
+    topic: str
+    payload: dict = Field(sa_column=sa.Column(sa.JSON(), nullable=False))
+
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = None
+    # not picked up before this; pushed back after each failed attempt
+    available_at: datetime = Field(
+        default_factory=utcnow,
+        index=True,
+        sa_type=sa.DateTime(timezone=True),
+        sa_column_kwargs={
+            "server_default": sa.func.now(),
+        },
+    )
+
+    created_at: datetime = Field(
+        default_factory=utcnow,
+        sa_type=sa.DateTime(timezone=True),
+        sa_column_kwargs={
+            "server_default": sa.func.now(),
+        },
+    )
@@ -0,0 +1,241 @@
+"""Transactional outbox for messages to Pub/Sub.
+
+Request handlers ``enqueue`` a message in the same transaction as the rows it
+describes, which costs one local insert and no broker round trip. The
+``OutboxRelay`` background task drains ``outbox_messages`` in batches: it
+publishes every message of a batch, waits for each confirmation, deletes the
+confirmed rows and pushes failed ones back with exponential backoff. Rows are
+claimed with ``FOR UPDATE SKIP LOCKED``, so every API instance can run a relay.
+
+Delivery is at-least-once (a crash between publish and delete re-sends the
+batch), so consumers must treat duplicates as no-ops.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import Future
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert
+from sqlmodel import Session, select
+
+from src.config import get_settings
+from src.datetime_utils import utcnow
+from src.events.models import OutboxMessage
+from src.metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+published = counter("outbox_messages_published")
+publish_failures = counter("outbox_publish_failures")
+relay_seconds = histogram("outbox_relay_seconds")
+
+MAX_ERROR_LENGTH = 1000
+
+
+class MessageBroker(ABC):
+    @abstractmethod
+    def publish(self, topic: str, data: bytes) -> Future:
+        """Starts publishing ``data``; the future resolves once the broker
+        has accepted it."""
+
+
+class InMemoryBroker(MessageBroker):
+    """Keeps published messages per topic; for tests and local runs.
+
+    ``fail_next`` makes that many following publishes fail, to exercise the
+    relay's retries.
+    """
+
+    def __init__(self):
+        self.messages: dict[str, list[bytes]] = defaultdict(list)
+        self.fail_next = 0
+        self._lock = threading.Lock()
+
+    def publish(self, topic, data):
+        future: Future = Future()
+        with self._lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                future.set_exception(RuntimeError("simulated publish failure"))
+            else:
+                self.messages[topic].append(data)
+                future.set_result(str(len(self.messages[topic])))
+        return future
+
+    def payloads(self, topic: str) -> list[dict]:
+        return [json.loads(data) for data in self.messages.get(topic, [])]
+
+
+_broker: Optional[MessageBroker] = None
+
+
+def get_message_broker() -> MessageBroker:
+    global _broker
+    if _broker is None:
+        from src.gcp.publisher import Publisher, PubSubBroker
+
+        if get_settings().OUTBOX_BROKER.lower() == "memory":
+            _broker = Publisher(InMemoryBroker())
+        else:
+            _broker = Publisher(PubSubBroker())
+    return _broker
+
+
+def enqueue(session: Session, topic: str, payload: dict) -> None:
+    """Adds a message to the outbox in the caller's transaction."""
+    session.exec(insert(OutboxMessage).values(topic=topic, payload=payload))
+
+
+def _backoff_seconds(attempts: int) -> float:
+    settings = get_settings()
+    delay = min(
+        settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.OUTBOX_RETRY_MAX_SECONDS,
+    )
+    # jitter, so messages that failed together do not retry together
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _publish(broker: MessageBroker, message: OutboxMessage) -> Future:
+    try:
+        return broker.publish(message.topic, json.dumps(message.payload).encode("utf-8"))
+    except Exception as e:
+        future: Future = Future()
+        future.set_exception(e)
+        return future
+
+
+def relay_batch(session: Session, broker: MessageBroker, batch_size: int) -> int:
+    """Publishes up to ``batch_size`` due messages and commits; returns how
+    many were claimed."""
+    messages = session.exec(
+        select(OutboxMessage)
+        .where(OutboxMessage.available_at <= func.now())
+        .order_by(OutboxMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not messages:
+        session.rollback()
+        return 0
+
+    futures = [(message, _publish(broker, message)) for message in messages]
+    deadline = time.monotonic() + get_settings().OUTBOX_PUBLISH_TIMEOUT_SECONDS
+    confirmed: list[int] = []
+    for message, future in futures:
+        try:
+            future.result(timeout=max(deadline - time.monotonic(), 0))
+            confirmed.append(message.id)
+        except Exception as e:
+            message.attempts += 1
+            message.last_error = str(e)[:MAX_ERROR_LENGTH] or type(e).__name__
+            message.available_at = utcnow() + timedelta(seconds=_backoff_seconds(message.attempts))
+            session.add(message)
+            logger.warning(
+                "Publishing outbox message %s to %s failed (attempt %s): %s",
+                message.id, message.topic, message.attempts, e,
+            )
+
+    if confirmed:
+        session.exec(delete(OutboxMessage).where(OutboxMessage.id.in_(confirmed)))
+    session.commit()
+
+    published.inc(len(confirmed))
+    publish_failures.inc(len(messages) - len(confirmed))
+    return len(messages)
+
+
+def relay_pending(batch_size: int, broker: Optional[MessageBroker] = None) -> int:
+    """Relays until no due message is left; returns the number claimed."""
+    from src.db import engine
+
+    broker = broker or get_message_broker()
+    total = 0
+    while True:
+        start = time.perf_counter()
+        with Session(engine) as session:
+            claimed = relay_batch(session, broker, batch_size)
+        relay_seconds.observe(time.perf_counter() - start)
+        total += claimed
+        if claimed < batch_size:
+            return total
+
+
+class OutboxRelay:
+    """Background task that drains the outbox every ``interval`` seconds, or
+    as soon as ``wake`` is called after a commit."""
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+
+    def wake(self) -> None:
+        """Safe to call from any thread; a no-op when the relay is not running."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # loop already closed during shutdown
+                pass
+
+    async def _run(self) -> None:
+        logger.info("Relaying outbox messages every %ss", self.interval)
+        while True:
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(relay_pending, self.batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox relay failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+_settings = get_settings()
+relay = OutboxRelay(
+    interval=_settings.OUTBOX_RELAY_INTERVAL_SECONDS,
+    batch_size=_settings.OUTBOX_BATCH_SIZE,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish pending outbox messages")
+    parser.add_argument("--batch-size", type=int, default=_settings.OUTBOX_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print(f"Relayed {relay_pending(args.batch_size)} outbox messages")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,77 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Header
 from fastapi.responses import StreamingResponse
+from typing import Optional
 import json
 import time
-from sqlmodel import Session, select
 
-from src.db import get_session
-from src.auth.utils import get_current_user
-from src.videos.models import VideoGenerationJob
+from src.events.broker import broker, load_user_jobs, RESYNC
 from src.security import decode_token
-from src.db import engine
+from src.config import get_settings
 import asyncio
 from fastapi import Query
 
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+
+def _sse(event: str, event_id: str, data) -> str:
+    return f"event: {event}\nid: {event_id}\ndata: {json.dumps(data)}\n\n"
+
+
 @router.get("/video-generation")
-async def video_generation_events(token: str = Query(...)):
+async def video_generation_events(
+    token: str = Query(...),
+    last_event_id: Optional[str] = Header(default=None),
+):
+    """Streams the user's generation jobs.
+
+    The first message is a ``snapshot`` event with active and recent jobs;
+    after that each change is sent as a ``job`` event carrying one job. A
+    reconnect with ``Last-Event-ID`` replays only the missed ``job`` events
+    when they are still buffered, and falls back to a new snapshot otherwise.
+    """
 
     payload = decode_token(token)
     user_id = int(payload["sub"])
+    settings = get_settings()
 
     async def event_stream():
-        last_payload = None
-
-        while True:
-            try:
-                with Session(engine) as session:
-                    jobs = session.exec(
-                        select(VideoGenerationJob)
-                        .where(VideoGenerationJob.user_id == user_id)
-                        .order_by(VideoGenerationJob.updated_at.desc())
-                    ).all()
-
-                data = [
-                    {
-                        "id": j.id,
-                        "status": j.status,
-                        "prompt": j.prompt,
-                        "reference_image_paths": j.reference_image_paths or [],
-                        "preview_video_path": j.preview_video_path,
-                        "preview_thumbnail_path": j.preview_thumbnail_path,
-                        "error_message": j.error_message,
-                        "published_video_id": j.published_video_id,
-                        "updated_at": j.updated_at.isoformat() if j.updated_at else None,
-                    }
-                    for j in jobs
-                ]
-
-                payload_json = json.dumps(data)
-
-                if payload_json != last_payload:
-                    last_payload = payload_json
-                    yield f"data: {payload_json}\n\n"
-                else:
-                    # heartbeat
-                    yield f": ping {int(time.time())}\n\n"
-
-            except Exception as e:
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
-
-            await asyncio.sleep(3)
+        queue = broker.subscribe(user_id)
+        missed = broker.replay(user_id, last_event_id)
+        needs_snapshot = missed is None
+
+        try:
+            for event_id, job in missed or ():
+                yield _sse("job", event_id, job)
+
+            while True:
+                try:
+                    if needs_snapshot:
+                        snapshot_id = broker.current_event_id()
+                        jobs = await asyncio.to_thread(load_user_jobs, user_id, settings.EVENTS_SNAPSHOT_LIMIT)
+                        needs_snapshot = False
+                        yield _sse("snapshot", snapshot_id, jobs)
+                        continue
+
+                    try:
+                        event = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield f": ping {int(time.time())}\n\n"
+                        continue
+
+                    if event is RESYNC:
+                        needs_snapshot = True
+                        continue
+
+                    event_id, job = event
+                    yield _sse("job", event_id, job)
+
+                except Exception as e:
+                    yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+                    needs_snapshot = True
+                    await asyncio.sleep(3)
+        finally:
+            broker.unsubscribe(user_id, queue)
 
     return StreamingResponse(
         event_stream(),
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional
+
+from src.db import get_async_session
+from src.auth.utils import get_current_user_async
+from src.feed.service import get_feed_videos_async, get_home_feed_videos_async
+from src.feed.schema import FeedSchema
+
+router = APIRouter(prefix="/feed", tags=["feed"])
+
+
+@router.get("/", response_model=FeedSchema)
+async def get_feed(
+    page_token: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=50),
+    session: AsyncSession = Depends(get_async_session),
+    current_user=Depends(get_current_user_async),
+):
+    return await get_feed_videos_async(
+        session=session,
+        current_user=current_user,
+        limit=limit,
+        page_token=page_token,
+    )
+
+
+@router.get("/home", response_model=FeedSchema)
+async def get_home_feed(
+    page_token: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=50),
+    session: AsyncSession = Depends(get_async_session),
+    current_user=Depends(get_current_user_async),
+):
+    return await get_home_feed_videos_async(
+        session=session,
+        current_user=current_user,
+        limit=limit,
+        page_token=page_token,
+    )
@@ -0,0 +1,23 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+import sqlalchemy as sa
+
+
+class HomeTimelineEntry(SQLModel, table=True):
+    __tablename__ = "home_timelines"
+    __table_args__ = (
+        sa.Index(
+            "ix_home_timelines_user_created_at_video",
+            "user_id",
+            sa.text("created_at DESC"),
+            sa.text("video_id DESC"),
+        ),
+        sa.Index("ix_home_timelines_user_author", "user_id", "author_id"),
+    )
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    video_id: int = Field(foreign_key="videos.id", primary_key=True)
+    author_id: int = Field(foreign_key="users.id")
+
+    # copy of videos.created_at so pages are a range scan on this table alone
+    created_at: datetime = Field(sa_type=sa.DateTime(timezone=True))
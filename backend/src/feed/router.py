@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session
+from typing import Optional
 
-from src.db import get_session
+from src.db import get_read_session
 from src.auth.utils import get_current_user
-from src.feed.service import get_feed_videos
+from src.feed.service import get_feed_videos, get_home_feed_videos
 from src.feed.schema import FeedSchema
 
 router = APIRouter(prefix="/feed", tags=["feed"])
@@ -11,7 +12,30 @@ router = APIRouter(prefix="/feed", tags=["feed"])
 
 @router.get("/", response_model=FeedSchema)
 def get_feed(
-    session: Session = Depends(get_session),
+    page_token: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=50),
+    session: Session = Depends(get_read_session),
     current_user=Depends(get_current_user),
 ):
-    return get_feed_videos(session=session, current_user=current_user)
+    return get_feed_videos(
+        session=session,
+        current_user=current_user,
+        limit=limit,
+        page_token=page_token,
+    )
+
+
+
+@router.get("/home", response_model=FeedSchema)
+def get_home_feed(
+    page_token: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=50),
+    session: Session = Depends(get_read_session),
+    current_user=Depends(get_current_user),
+):
+    return get_home_feed_videos(
+        session=session,
+        current_user=current_user,
+        limit=limit,
+        page_token=page_token,
+    )
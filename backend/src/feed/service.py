@@ -1,6 +1,9 @@
 from sqlmodel import Session, select
-from sqlalchemy import func, case
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func, tuple_
 from typing import Optional
+from datetime import datetime
+import asyncio
 
 from src.feed.schema import FeedSchema, FeedItemSchema
 from src.user_interactions.models import Like
@@ -8,81 +11,57 @@ from src.videos.models import Video
 from src.auth.models import User
 from src.auth.utils import get_current_user
 from src.db import get_session
-from src.gcp.storage import signed_get_url
-from src.config import get_settings
-
-
-def _signed_media_url(path: Optional[str], minutes: int = 30) -> Optional[str]:
-    if not path:
-        return None
-    if path.startswith("http://") or path.startswith("https://"):
-        return path
-    if path.startswith("gs://"):
-        trimmed = path[len("gs://"):]
-        bucket, _, object_name = trimmed.partition("/")
-        if bucket and object_name:
-            return signed_get_url(bucket, object_name, minutes=minutes)
-    settings = get_settings()
-    object_name = path.lstrip("/")
-    if settings.GCS_BUCKET_NAME and object_name:
-        path = signed_get_url(settings.GCS_BUCKET_NAME, object_name, minutes=minutes)
-        print(f"Generated signed URL for {path}: {path}")
-        return path
-    return path
+from src.gcp.signing import sign_many
+from src.pagination import encode_cursor, decode_cursor
+from src.feed.timeline import read_home_timeline
+from src.user_interactions.counters import comments_count_expr, likes_count_expr
 
+FEED_CURSOR_SALT = "feed"
+HOME_FEED_CURSOR_SALT = "home_feed"
 
-def get_feed_videos(
-    *,
-    session: Session,
-    current_user,
-    limit: int = 20,
-    offset: int = 0,
-) -> FeedSchema:
 
-    liked_subq = (
-        select(Like.video_id)
-        .where(Like.user_id == current_user.id)
-        .subquery()
+def _feed_stmt(current_user):
+    # one probe of uq_likes_user_id_video_id per row, instead of joining
+    # every like the user has ever made
+    is_liked = (
+        select(Like.id)
+        .where(Like.user_id == current_user.id, Like.video_id == Video.id)
+        .correlate(Video)
+        .exists()
     )
 
-    stmt = (
+    return (
         select(
             Video.id.label("video_id"),
             Video.caption,
             Video.source_path,
             Video.processed_path.label("video_url"),
             Video.thumbnail_path.label("thumbnail_url"),
-            Video.likes_count,
-            Video.comments_count,
+            likes_count_expr().label("likes_count"),
+            comments_count_expr().label("comments_count"),
             Video.created_at,
             User.username.label("owner_username"),
             User.profile_pic.label("owner_profile_pic"),
-            case(
-                (liked_subq.c.video_id.isnot(None), True),
-                else_=False,
-            ).label("is_liked_by_user"),
+            is_liked.label("is_liked_by_user"),
         )
         .join(User, User.id == Video.user_id)
-        # Uncomment when follow-based feed is enabled
-        # .join(Follow, Follow.followed_id == Video.user_id)
-        # .where(Follow.follower_id == current_user.id)
-        .outerjoin(liked_subq, liked_subq.c.video_id == Video.id)
         .where(Video.status == "READY")
-        .order_by(Video.created_at.desc())
-        .limit(limit)
-        .offset(offset)
     )
 
-    rows = session.exec(stmt).all()
 
-    items = [
+def _feed_items(rows) -> list[FeedItemSchema]:
+    urls = sign_many(
+        path for row in rows for path in (row.source_path, row.thumbnail_url)
+    )
+
+    return [
         FeedItemSchema(
             video_id=row.video_id,
             owner_username=row.owner_username,
             owner_profile_pic=row.owner_profile_pic,
             caption=row.caption,
-            video_url=_signed_media_url(row.source_path),
-            thumbnail_url=_signed_media_url(row.thumbnail_url),
+            video_url=urls.get(row.source_path),
+            thumbnail_url=urls.get(row.thumbnail_url),
             likes_count=row.likes_count,
             comments_count=row.comments_count,
             is_liked_by_user=row.is_liked_by_user,
@@ -91,4 +70,117 @@ def get_feed_videos(
         for row in rows
     ]
 
-    return FeedSchema(items=items)
+
+def _feed_page_stmt(current_user, cursor, limit: int):
+    stmt = (
+        _feed_stmt(current_user)
+        .order_by(Video.created_at.desc(), Video.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        stmt = stmt.where(
+            tuple_(Video.created_at, Video.id)
+            < tuple_(*cursor, types=[Video.created_at.type, Video.id.type])
+        )
+    return stmt
+
+
+def _feed_page(rows, limit: int) -> tuple[list, Optional[str]]:
+    next_page_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_page_token = encode_cursor(FEED_CURSOR_SALT, last.created_at, last.video_id)
+    return rows, next_page_token
+
+
+def get_feed_videos(
+    *,
+    session: Session,
+    current_user,
+    limit: int = 20,
+    page_token: Optional[str] = None,
+) -> FeedSchema:
+    cursor = decode_cursor(FEED_CURSOR_SALT, page_token, datetime, int)
+
+    rows = session.exec(_feed_page_stmt(current_user, cursor, limit)).all()
+    rows, next_page_token = _feed_page(rows, limit)
+
+    return FeedSchema(items=_feed_items(rows), next_page_token=next_page_token)
+
+
+async def get_feed_videos_async(
+    *,
+    session: AsyncSession,
+    current_user,
+    limit: int = 20,
+    page_token: Optional[str] = None,
+) -> FeedSchema:
+    cursor = decode_cursor(FEED_CURSOR_SALT, page_token, datetime, int)
+
+    rows = (await session.exec(_feed_page_stmt(current_user, cursor, limit))).all()
+    rows, next_page_token = _feed_page(rows, limit)
+
+    # signing may call out to IAM on cache misses
+    items = await asyncio.to_thread(_feed_items, rows)
+    return FeedSchema(items=items, next_page_token=next_page_token)
+
+
+def _home_feed_page(entries, limit: int) -> tuple[list, Optional[str]]:
+    next_page_token = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_page_token = encode_cursor(HOME_FEED_CURSOR_SALT, *entries[-1])
+    return entries, next_page_token
+
+
+def _home_feed_stmt(current_user, entries):
+    return _feed_stmt(current_user).where(Video.id.in_([video_id for _, video_id in entries]))
+
+
+def _in_timeline_order(rows, entries) -> list:
+    rows_by_id = {row.video_id: row for row in rows}
+    return [rows_by_id[video_id] for _, video_id in entries if video_id in rows_by_id]
+
+
+def get_home_feed_videos(
+    *,
+    session: Session,
+    current_user,
+    limit: int = 20,
+    page_token: Optional[str] = None,
+) -> FeedSchema:
+    cursor = decode_cursor(HOME_FEED_CURSOR_SALT, page_token, datetime, int)
+
+    entries = read_home_timeline(session, current_user.id, cursor, limit + 1)
+    entries, next_page_token = _home_feed_page(entries, limit)
+
+    if not entries:
+        return FeedSchema(items=[], next_page_token=None)
+
+    rows = session.exec(_home_feed_stmt(current_user, entries)).all()
+    rows = _in_timeline_order(rows, entries)
+
+    return FeedSchema(items=_feed_items(rows), next_page_token=next_page_token)
+
+
+async def get_home_feed_videos_async(
+    *,
+    session: AsyncSession,
+    current_user,
+    limit: int = 20,
+    page_token: Optional[str] = None,
+) -> FeedSchema:
+    cursor = decode_cursor(HOME_FEED_CURSOR_SALT, page_token, datetime, int)
+
+    entries = await session.run_sync(read_home_timeline, current_user.id, cursor, limit + 1)
+    entries, next_page_token = _home_feed_page(entries, limit)
+
+    if not entries:
+        return FeedSchema(items=[], next_page_token=None)
+
+    rows = (await session.exec(_home_feed_stmt(current_user, entries))).all()
+    rows = _in_timeline_order(rows, entries)
+
+    items = await asyncio.to_thread(_feed_items, rows)
+    return FeedSchema(items=items, next_page_token=next_page_token)
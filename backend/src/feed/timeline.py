@@ -0,0 +1,309 @@
+"""Precomputed home timelines.
+
+New videos are fanned out on write into each follower's timeline. Authors
+with more than ``TIMELINE_FANOUT_MAX_FOLLOWERS`` followers are skipped on
+write and merged in when the timeline is read instead.
+"""
+import argparse
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy import delete, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+
+from src.config import get_settings
+from src.feed.models import HomeTimelineEntry
+from src.users.models import Follow
+from src.videos.enums import VideoStatus
+from src.videos.models import Video
+
+# (created_at, video_id), newest first
+TimelineItem = tuple[datetime, int]
+
+
+class TimelineStore(ABC):
+    @abstractmethod
+    def add(self, session: Session, user_ids: list[int], author_id: int, items: list[TimelineItem]) -> None:
+        pass
+
+    @abstractmethod
+    def remove_author(self, session: Session, user_id: int, author_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def read(self, session: Session, user_id: int, cursor: Optional[TimelineItem], limit: int) -> list[TimelineItem]:
+        pass
+
+
+class PostgresTimelineStore(TimelineStore):
+    """Timeline rows live in ``home_timelines`` and are written in the caller's
+    transaction."""
+
+    def add(self, session, user_ids, author_id, items):
+        if not user_ids or not items:
+            return
+        rows = [
+            {
+                "user_id": user_id,
+                "video_id": video_id,
+                "author_id": author_id,
+                "created_at": created_at,
+            }
+            for user_id in user_ids
+            for created_at, video_id in items
+        ]
+        session.exec(pg_insert(HomeTimelineEntry).values(rows).on_conflict_do_nothing())
+
+    def fan_out_to_followers(self, session, author_id, video_id, created_at):
+        # one INSERT ... SELECT instead of pulling follower ids into Python
+        followers = select(
+            Follow.follower_id,
+            sa.literal(video_id, sa.Integer),
+            sa.literal(author_id, sa.Integer),
+            sa.literal(created_at, sa.DateTime(timezone=True)),
+        ).where(Follow.followed_id == author_id)
+        session.exec(
+            pg_insert(HomeTimelineEntry)
+            .from_select(["user_id", "video_id", "author_id", "created_at"], followers)
+            .on_conflict_do_nothing()
+        )
+
+    def remove_author(self, session, user_id, author_id):
+        session.exec(
+            delete(HomeTimelineEntry).where(
+                HomeTimelineEntry.user_id == user_id,
+                HomeTimelineEntry.author_id == author_id,
+            )
+        )
+
+    def read(self, session, user_id, cursor, limit):
+        stmt = (
+            select(HomeTimelineEntry.created_at, HomeTimelineEntry.video_id)
+            .where(HomeTimelineEntry.user_id == user_id)
+            .order_by(HomeTimelineEntry.created_at.desc(), HomeTimelineEntry.video_id.desc())
+            .limit(limit)
+        )
+        if cursor:
+            stmt = stmt.where(
+                tuple_(HomeTimelineEntry.created_at, HomeTimelineEntry.video_id)
+                < tuple_(*cursor, types=[HomeTimelineEntry.created_at.type, HomeTimelineEntry.video_id.type])
+            )
+        return [(row[0], row[1]) for row in session.exec(stmt).all()]
+
+
+class RedisTimelineStore(TimelineStore):
+    """Timelines as capped sorted sets scored by video creation time.
+
+    Members are ``"{video_id}:{author_id}"`` so unfollows can drop an author's
+    entries without a secondary index. Redis orders members that share a
+    score by member string, not video id, so ``read`` fetches every member at
+    the two boundary scores (the cursor's and the page's last) and sorts by
+    ``(created_at, video_id)`` itself, matching the Postgres keyset order.
+    """
+
+    def __init__(self, client, max_entries: int):
+        self.client = client
+        self.max_entries = max_entries
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"timeline:{user_id}"
+
+    def add(self, session, user_ids, author_id, items):
+        if not user_ids or not items:
+            return
+        mapping = {f"{video_id}:{author_id}": created_at.timestamp() for created_at, video_id in items}
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in user_ids:
+            key = self._key(user_id)
+            pipe.zadd(key, mapping)
+            pipe.zremrangebyrank(key, 0, -(self.max_entries + 1))
+        pipe.execute()
+
+    def remove_author(self, session, user_id, author_id):
+        key = self._key(user_id)
+        suffix = f":{author_id}"
+        members = [
+            member for member, _ in self.client.zscan_iter(key)
+            if member.decode().endswith(suffix)
+        ]
+        if members:
+            self.client.zrem(key, *members)
+
+    def _ties(self, key: str, score: float) -> list:
+        return self.client.zrangebyscore(key, score, score, withscores=True)
+
+    def read(self, session, user_id, cursor, limit):
+        key = self._key(user_id)
+        members = []
+        if cursor:
+            cursor_score = cursor[0].timestamp()
+            # entries sharing the cursor's timestamp, older ones filtered below
+            members += self._ties(key, cursor_score)
+            max_score = f"({cursor_score}"
+        else:
+            max_score = "+inf"
+        older = self.client.zrevrangebyscore(key, max_score, "-inf", start=0, num=limit, withscores=True)
+        members += older
+        if len(older) == limit:
+            # the page may cut through a run of equal timestamps
+            members += self._ties(key, older[-1][1])
+
+        items = set()
+        for member, score in members:
+            video_id = int(member.decode().partition(":")[0])
+            if cursor and (score, video_id) >= (cursor_score, cursor[1]):
+                continue
+            items.add((datetime.fromtimestamp(score, tz=timezone.utc), video_id))
+        return sorted(items, reverse=True)[:limit]
+
+
+_store: Optional[TimelineStore] = None
+
+
+def get_timeline_store() -> TimelineStore:
+    global _store
+    if _store is None:
+        settings = get_settings()
+        if settings.TIMELINE_BACKEND.lower() == "redis":
+            from src.redis_client import get_redis
+
+            _store = RedisTimelineStore(get_redis(), settings.TIMELINE_MAX_ENTRIES)
+        else:
+            _store = PostgresTimelineStore()
+    return _store
+
+
+_celebrities: tuple[float, frozenset[int]] = (0.0, frozenset())
+_celebrities_lock = threading.Lock()
+
+
+def _follower_count(session: Session, user_id: int) -> int:
+    return session.exec(
+        select(func.count()).select_from(Follow).where(Follow.followed_id == user_id)
+    ).one()
+
+
+def _celebrity_ids(session: Session) -> frozenset[int]:
+    """Authors read on fan-out-on-read, refreshed at most every few minutes."""
+    global _celebrities
+    settings = get_settings()
+    loaded_at, ids = _celebrities
+    if time.monotonic() - loaded_at < settings.TIMELINE_CELEBRITY_CACHE_SECONDS:
+        return ids
+    with _celebrities_lock:
+        rows = session.exec(
+            select(Follow.followed_id)
+            .group_by(Follow.followed_id)
+            .having(func.count() > settings.TIMELINE_FANOUT_MAX_FOLLOWERS)
+        ).all()
+        ids = frozenset(rows)
+        _celebrities = (time.monotonic(), ids)
+    return ids
+
+
+def _recent_videos(session: Session, author_ids: list[int], cursor: Optional[TimelineItem], limit: int) -> list[TimelineItem]:
+    stmt = (
+        select(Video.created_at, Video.id)
+        .where(Video.user_id.in_(author_ids), Video.status == VideoStatus.READY)
+        .order_by(Video.created_at.desc(), Video.id.desc())
+        .limit(limit)
+    )
+    if cursor:
+        stmt = stmt.where(
+            tuple_(Video.created_at, Video.id)
+            < tuple_(*cursor, types=[Video.created_at.type, Video.id.type])
+        )
+    return [(row[0], row[1]) for row in session.exec(stmt).all()]
+
+
+def fan_out_video(session: Session, video: Video) -> None:
+    """Pushes a newly published video into its author's followers' timelines."""
+    if _follower_count(session, video.user_id) > get_settings().TIMELINE_FANOUT_MAX_FOLLOWERS:
+        return
+
+    store = get_timeline_store()
+    if isinstance(store, PostgresTimelineStore):
+        store.fan_out_to_followers(session, video.user_id, video.id, video.created_at)
+        return
+
+    follower_ids = session.exec(
+        select(Follow.follower_id).where(Follow.followed_id == video.user_id)
+    ).all()
+    store.add(session, list(follower_ids), video.user_id, [(video.created_at, video.id)])
+
+
+def backfill_follow(session: Session, follower_id: int, followed_id: int) -> None:
+    """Seeds a new follower's timeline with the followed account's recent videos."""
+    if followed_id in _celebrity_ids(session):
+        return
+    items = _recent_videos(session, [followed_id], None, get_settings().TIMELINE_BACKFILL_LIMIT)
+    get_timeline_store().add(session, [follower_id], followed_id, items)
+
+
+def remove_follow(session: Session, follower_id: int, followed_id: int) -> None:
+    get_timeline_store().remove_author(session, follower_id, followed_id)
+
+
+def read_home_timeline(
+    session: Session,
+    user_id: int,
+    cursor: Optional[TimelineItem],
+    limit: int,
+) -> list[TimelineItem]:
+    items = get_timeline_store().read(session, user_id, cursor, limit)
+
+    celebrities = _celebrity_ids(session)
+    if celebrities:
+        followed_celebrities = session.exec(
+            select(Follow.followed_id).where(
+                Follow.follower_id == user_id,
+                Follow.followed_id.in_(celebrities),
+            )
+        ).all()
+        if followed_celebrities:
+            merged = {video_id: created_at for created_at, video_id in items}
+            for created_at, video_id in _recent_videos(session, list(followed_celebrities), cursor, limit):
+                merged.setdefault(video_id, created_at)
+            items = sorted(
+                ((created_at, video_id) for video_id, created_at in merged.items()),
+                reverse=True,
+            )[:limit]
+
+    return items
+
+
+def rebuild_timeline(session: Session, user_id: int) -> None:
+    """Re-seeds a user's timeline from everyone they follow."""
+    followed_ids = session.exec(
+        select(Follow.followed_id).where(Follow.follower_id == user_id)
+    ).all()
+    for followed_id in followed_ids:
+        backfill_follow(session, user_id, followed_id)
+
+
+def main():
+    from src.db import engine
+
+    parser = argparse.ArgumentParser(description="Backfill home timelines")
+    parser.add_argument("--user-id", type=int, help="Only rebuild this user's timeline")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        if args.user_id:
+            user_ids = [args.user_id]
+        else:
+            user_ids = session.exec(select(Follow.follower_id).distinct()).all()
+        for user_id in user_ids:
+            rebuild_timeline(session, user_id)
+            session.commit()
+            print(f"Rebuilt timeline for user {user_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Process-wide Google Cloud clients, each created on first use.
+
+Nothing here runs at import time, so routes that never touch GCS or Pub/Sub
+pay no client setup on a cold start. The HTTP-based clients (storage, token
+refresh, IAM signBlob) share one connection pool of ``GCP_HTTP_POOL_SIZE``
+connections; the Pub/Sub publisher keeps its own gRPC channel.
+"""
+import os
+import threading
+from functools import lru_cache, wraps
+
+import google.auth
+import requests
+from google.auth.transport.requests import AuthorizedSession, Request
+from requests.adapters import HTTPAdapter
+
+from src.config import get_settings
+
+CLOUD_PLATFORM_SCOPE = "https://www.googleapis.com/auth/cloud-platform"
+
+_lock = threading.RLock()
+
+
+def _once(factory):
+    """Caches ``factory()`` for the process; concurrent first calls build it once."""
+    cached = lru_cache(maxsize=None)(factory)
+
+    @wraps(factory)
+    def get():
+        with _lock:
+            return cached()
+
+    get.cache_clear = cached.cache_clear
+    return get
+
+
+@_once
+def get_credentials():
+    """``(credentials, project)`` from Application Default Credentials."""
+    return google.auth.default(scopes=[CLOUD_PLATFORM_SCOPE])
+
+
+@_once
+def _http_adapter() -> HTTPAdapter:
+    size = get_settings().GCP_HTTP_POOL_SIZE
+    return HTTPAdapter(pool_connections=size, pool_maxsize=size)
+
+
+def _mount(session: requests.Session) -> requests.Session:
+    adapter = _http_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@_once
+def get_auth_request() -> Request:
+    """Transport for token refreshes and IAM calls, on the shared pool."""
+    return Request(session=_mount(requests.Session()))
+
+
+@_once
+def get_http_session() -> AuthorizedSession:
+    credentials, _ = get_credentials()
+    return _mount(AuthorizedSession(credentials, auth_request=get_auth_request()))
+
+
+@_once
+def get_storage_client():
+    from google.cloud import storage
+
+    credentials, project = get_credentials()
+    return storage.Client(
+        project=project or get_settings().GCP_PROJECT_ID,
+        credentials=credentials,
+        _http=get_http_session(),
+    )
+
+
+@_once
+def get_publisher_client():
+    from google.cloud import pubsub_v1
+    from google.cloud.pubsub_v1 import types
+
+    settings = get_settings()
+    batch_settings = types.BatchSettings(
+        max_bytes=settings.PUBSUB_BATCH_MAX_BYTES,
+        max_latency=settings.PUBSUB_BATCH_MAX_LATENCY_SECONDS,
+        max_messages=settings.PUBSUB_BATCH_MAX_MESSAGES,
+    )
+    publisher_options = types.PublisherOptions(
+        flow_control=types.PublishFlowControl(
+            message_limit=settings.PUBSUB_FLOW_CONTROL_MAX_MESSAGES,
+            byte_limit=settings.PUBSUB_FLOW_CONTROL_MAX_BYTES,
+            limit_exceeded_behavior=types.LimitExceededBehavior(settings.PUBSUB_FLOW_CONTROL_BEHAVIOR.lower()),
+        ),
+    )
+    if os.environ.get("PUBSUB_EMULATOR_HOST"):
+        # the client connects to the emulator without credentials
+        return pubsub_v1.PublisherClient(batch_settings, publisher_options)
+    credentials, _ = get_credentials()
+    return pubsub_v1.PublisherClient(batch_settings, publisher_options, credentials=credentials)
+
+
+@_once
+def get_secret_manager_client():
+    from google.cloud import secretmanager
+
+    credentials, _ = get_credentials()
+    return secretmanager.SecretManagerServiceClient(credentials=credentials)
@@ -1,18 +1,124 @@
+"""Pub/Sub publishing.
 
-from google.cloud import pubsub_v1
+``PubSubBroker`` hands messages to the process-wide ``PublisherClient``,
+which batches them (``PUBSUB_BATCH_*``) and bounds unconfirmed messages
+(``PUBSUB_FLOW_CONTROL_*``). ``Publisher`` wraps any broker backend and
+tracks every message until it is confirmed or fails, so the outbox relay,
+the emulator and the in-memory backend all report the same metrics.
+
+Load-test a burst offline with the in-memory backend (or against the
+emulator by setting ``PUBSUB_EMULATOR_HOST``)::
+
+    python -m src.gcp.publisher --count 5000 --backend memory
+"""
+import argparse
 import json
+import logging
+import time
+from concurrent.futures import Future, wait
+from typing import Callable, Optional
+
+from sqlmodel import Session
+
 from src.config import get_settings
+from src.events.outbox import InMemoryBroker, MessageBroker, enqueue
+from src.gcp.clients import get_publisher_client
+from src.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+published = counter("pubsub_messages_published")
+failed = counter("pubsub_publish_failures")
+in_flight = gauge("pubsub_messages_in_flight")
+publish_seconds = histogram("pubsub_publish_seconds")
 
 settings = get_settings()
 PROJECT_ID = settings.GCP_PROJECT_ID
 TOPIC = settings.GCP_PUBSUB_VIDEO_GEN_TOPIC
 
-publisher = pubsub_v1.PublisherClient()
-topic_path = publisher.topic_path(PROJECT_ID, TOPIC)
+
+def topic_path(topic: str) -> str:
+    return f"projects/{PROJECT_ID}/topics/{topic}"
+
+
+class PubSubBroker(MessageBroker):
+    def publish(self, topic, data):
+        # the client (and its gRPC channel) is built on the first publish
+        return get_publisher_client().publish(topic_path(topic), data)
+
+
+class Publisher(MessageBroker):
+    """Counts, times and confirms every message published through ``backend``.
+
+    ``callback`` is called with each message's future once it resolves, on
+    the backend's callback thread; keep it short.
+    """
+
+    def __init__(self, backend: MessageBroker, callback: Optional[Callable[[Future], None]] = None):
+        self.backend = backend
+        self.callback = callback
+
+    def publish(self, topic, data, callback: Optional[Callable[[Future], None]] = None):
+        start = time.perf_counter()
+        in_flight.inc()
+        try:
+            future = self.backend.publish(topic, data)
+        except Exception:
+            # flow control with the "error" behaviour, or a closed client
+            in_flight.dec()
+            failed.inc()
+            raise
+
+        def done(f: Future) -> None:
+            in_flight.dec()
+            publish_seconds.observe(time.perf_counter() - start)
+            if f.exception() is None:
+                published.inc()
+            else:
+                failed.inc()
+            for cb in (self.callback, callback):
+                if cb is not None:
+                    try:
+                        cb(f)
+                    except Exception:
+                        logger.exception("Publish callback failed")
+
+        future.add_done_callback(done)
+        return future
+
+
+def enqueue_generation_job(session: Session, job_id: int, prompt: str) -> None:
+    """Queues the dispatch message in the caller's transaction; the outbox
+    relay publishes it once the job row is committed."""
+    enqueue(session, TOPIC, {
+        "job_id": job_id,
+        "prompt": prompt,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish a burst of fake generation jobs")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--topic", default=TOPIC)
+    parser.add_argument("--prompt-bytes", type=int, default=200)
+    parser.add_argument("--backend", choices=["memory", "pubsub"], default="memory")
+    args = parser.parse_args()
+
+    publisher = Publisher(InMemoryBroker() if args.backend == "memory" else PubSubBroker())
+    prompt = "x" * args.prompt_bytes
+
+    start = time.perf_counter()
+    futures = [
+        publisher.publish(args.topic, json.dumps({"job_id": i, "prompt": prompt}).encode("utf-8"))
+        for i in range(args.count)
+    ]
+    wait(futures)
+    elapsed = time.perf_counter() - start
+
+    print(f"Published {published.value} ({failed.value} failed) in {elapsed:.2f}s, "
+          f"{args.count / elapsed:.0f} msg/s")
+    print(json.dumps({"in_flight": in_flight.value, publish_seconds.name: publish_seconds.snapshot()}, indent=2))
 
 
-def publish_generation_job(job_data: dict):
-    publisher.publish(
-        topic_path,
-        json.dumps(job_data).encode("utf-8"),
-    )
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import binascii
+import hashlib
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import quote
+
+from google.auth import crypt, iam
+
+from src.config import get_settings
+from src.gcp.clients import get_auth_request, get_credentials, get_secret_manager_client
+
+logger = logging.getLogger(__name__)
+
+GCS_ENDPOINT = "https://storage.googleapis.com"
+GCS_HOST = "storage.googleapis.com"
+MAX_V4_EXPIRATION_SECONDS = 7 * 24 * 60 * 60
+
+
+class Signer(ABC):
+    """Produces RSA-SHA256 signatures for GCS V4 string-to-signs."""
+
+    service_account_email: str
+
+    @abstractmethod
+    def sign(self, payload: bytes) -> bytes:
+        pass
+
+    def sign_many(self, payloads: list[bytes]) -> list[bytes]:
+        return [self.sign(payload) for payload in payloads]
+
+
+class LocalKeySigner(Signer):
+    """Signs in-process with a service-account private key.
+
+    Also serves as the offline stand-in: build it from a known PEM key to
+    check URLs against published V4 test vectors.
+    """
+
+    def __init__(self, private_key_pem: str, service_account_email: str, key_id: Optional[str] = None):
+        self.service_account_email = service_account_email
+        self._signer = crypt.RSASigner.from_string(private_key_pem, key_id=key_id)
+
+    @classmethod
+    def from_service_account_info(cls, info: dict) -> "LocalKeySigner":
+        return cls(
+            info["private_key"],
+            info["client_email"],
+            key_id=info.get("private_key_id"),
+        )
+
+    def sign(self, payload: bytes) -> bytes:
+        return self._signer.sign(payload)
+
+
+class SecretManagerKeySigner(Signer):
+    """Local signer whose service-account key is pulled from Secret Manager
+    and re-fetched every ``refresh_seconds`` so key rotation is picked up."""
+
+    def __init__(self, secret_name: str, refresh_seconds: int):
+        self.secret_name = secret_name
+        self.refresh_seconds = refresh_seconds
+        self._signer: Optional[LocalKeySigner] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._current()
+
+    def _fetch(self) -> LocalKeySigner:
+        response = get_secret_manager_client().access_secret_version(name=self.secret_name)
+        info = json.loads(response.payload.data.decode("utf-8"))
+        return LocalKeySigner.from_service_account_info(info)
+
+    def _current(self) -> LocalKeySigner:
+        if self._signer is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return self._signer
+        with self._lock:
+            if self._signer is None or time.monotonic() - self._loaded_at >= self.refresh_seconds:
+                try:
+                    self._signer = self._fetch()
+                except Exception:
+                    if self._signer is None:
+                        raise
+                    logger.exception("Signing key refresh failed, keeping previous key")
+                self._loaded_at = time.monotonic()
+        return self._signer
+
+    @property
+    def service_account_email(self) -> str:
+        return self._current().service_account_email
+
+    def sign(self, payload: bytes) -> bytes:
+        return self._current().sign(payload)
+
+
+class IamSigner(Signer):
+    """Signs through the IAM credentials signBlob API with credentials that are
+    created once, instead of once per URL. signBlob takes a single payload, so
+    ``sign_many`` fans a batch out over a bounded pool of concurrent calls."""
+
+    def __init__(self, service_account_email: str, max_workers: int = 8):
+        self.service_account_email = service_account_email
+        self.max_workers = max_workers
+        credentials, _ = get_credentials()
+        self._signer = iam.Signer(get_auth_request(), credentials, service_account_email)
+
+    def sign(self, payload: bytes) -> bytes:
+        return self._signer.sign(payload)
+
+    def sign_many(self, payloads: list[bytes]) -> list[bytes]:
+        if len(payloads) <= 1:
+            return [self.sign(payload) for payload in payloads]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(payloads))) as pool:
+            return list(pool.map(self.sign, payloads))
+
+
+def _v4_timestamps(now: datetime) -> tuple[str, str]:
+    now = now.astimezone(timezone.utc)
+    return now.strftime("%Y%m%dT%H%M%SZ"), now.strftime("%Y%m%d")
+
+
+def _quote_param(value) -> str:
+    return quote(str(value), safe="~")
+
+
+def v4_string_to_sign(
+    *,
+    service_account_email: str,
+    bucket: str,
+    object_name: str,
+    expiration: timedelta,
+    now: Optional[datetime] = None,
+    method: str = "GET",
+) -> tuple[str, str]:
+    """Returns ``(string_to_sign, url_without_signature)`` for a V4 query-string
+    signed URL, following the GCS canonical request rules."""
+    expiration_seconds = int(expiration.total_seconds())
+    if not 0 < expiration_seconds <= MAX_V4_EXPIRATION_SECONDS:
+        raise ValueError("V4 signed URL expiration must be between 1s and 7 days")
+
+    request_timestamp, datestamp = _v4_timestamps(now or datetime.now(timezone.utc))
+    credential_scope = f"{datestamp}/auto/storage/goog4_request"
+
+    resource = f"/{bucket}/{quote(object_name, safe='/~')}"
+    query_parameters = {
+        "X-Goog-Algorithm": "GOOG4-RSA-SHA256",
+        "X-Goog-Credential": f"{service_account_email}/{credential_scope}",
+        "X-Goog-Date": request_timestamp,
+        "X-Goog-Expires": expiration_seconds,
+        "X-Goog-SignedHeaders": "host",
+    }
+    canonical_query_string = "&".join(
+        sorted(f"{_quote_param(k)}={_quote_param(v)}" for k, v in query_parameters.items())
+    )
+
+    canonical_request = "\n".join([
+        method,
+        resource,
+        canonical_query_string,
+        f"host:{GCS_HOST}\n",
+        "host",
+        "UNSIGNED-PAYLOAD",
+    ])
+    string_to_sign = "\n".join([
+        "GOOG4-RSA-SHA256",
+        request_timestamp,
+        credential_scope,
+        hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+    ])
+    return string_to_sign, f"{GCS_ENDPOINT}{resource}?{canonical_query_string}"
+
+
+def _with_signature(url: str, signature: bytes) -> str:
+    return f"{url}&X-Goog-Signature={binascii.hexlify(signature).decode('ascii')}"
+
+
+def generate_v4_signed_url(
+    signer: Signer,
+    bucket: str,
+    object_name: str,
+    expiration: timedelta,
+    now: Optional[datetime] = None,
+) -> str:
+    string_to_sign, url = v4_string_to_sign(
+        service_account_email=signer.service_account_email,
+        bucket=bucket,
+        object_name=object_name,
+        expiration=expiration,
+        now=now,
+    )
+    return _with_signature(url, signer.sign(string_to_sign.encode("utf-8")))
+
+
+def generate_v4_signed_urls(
+    signer: Signer,
+    objects: list[tuple[str, str]],
+    expiration: timedelta,
+    now: Optional[datetime] = None,
+) -> list[str]:
+    """Signs many ``(bucket, object_name)`` pairs with one ``sign_many`` call."""
+    now = now or datetime.now(timezone.utc)
+    prepared = [
+        v4_string_to_sign(
+            service_account_email=signer.service_account_email,
+            bucket=bucket,
+            object_name=object_name,
+            expiration=expiration,
+            now=now,
+        )
+        for bucket, object_name in objects
+    ]
+    signatures = signer.sign_many([string_to_sign.encode("utf-8") for string_to_sign, _ in prepared])
+    return [_with_signature(url, signature) for (_, url), signature in zip(prepared, signatures)]
+
+
+_signer: Optional[Signer] = None
+_signer_lock = threading.Lock()
+_signer_loaded = False
+
+
+def _build_signer() -> Optional[Signer]:
+    settings = get_settings()
+    backend = settings.GCS_SIGNING_BACKEND.lower()
+    if backend == "iam":
+        return IamSigner(
+            settings.GCS_SIGNING_SERVICE_ACCOUNT,
+            max_workers=settings.GCS_SIGNING_MAX_WORKERS,
+        )
+    if backend == "secret_manager":
+        if not settings.GCS_SIGNING_KEY_SECRET:
+            raise RuntimeError("GCS_SIGNING_KEY_SECRET is required for the secret_manager signing backend")
+        return SecretManagerKeySigner(
+            settings.GCS_SIGNING_KEY_SECRET,
+            refresh_seconds=settings.GCS_SIGNING_KEY_REFRESH_SECONDS,
+        )
+    return None
+
+
+def get_signer() -> Optional[Signer]:
+    """Returns the configured signer, or ``None`` when the legacy per-call
+    signing path should be used."""
+    global _signer, _signer_loaded
+    if not _signer_loaded:
+        with _signer_lock:
+            if not _signer_loaded:
+                try:
+                    _signer = _build_signer()
+                except Exception:
+                    logger.exception("Could not initialise URL signer, using legacy signing")
+                    _signer = None
+                _signer_loaded = True
+    return _signer
+
+
+def set_signer(signer: Optional[Signer]) -> None:
+    global _signer, _signer_loaded
+    with _signer_lock:
+        _signer = signer
+        _signer_loaded = True
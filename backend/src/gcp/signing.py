@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from src.config import get_settings
+from src.gcp.signers import generate_v4_signed_urls, get_signer
+from src.gcp.storage import legacy_signed_get_url, signed_get_url
+from src.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+cache_hits = counter("signed_url_cache_hits")
+cache_misses = counter("signed_url_cache_misses")
+cache_evictions = counter("signed_url_cache_evictions")
+
+
+class SignedUrlCache:
+    """LRU cache of signed URLs that only serves entries with enough life left."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, min_remaining_seconds: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            url, expires_at = entry
+            if expires_at - time.time() < min_remaining_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return url
+
+    def put(self, key: tuple, url: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (url, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                cache_evictions.inc()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache: Optional[SignedUrlCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SignedUrlCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SignedUrlCache(get_settings().SIGNED_URL_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def _resolve_object(path: str) -> Optional[tuple[str, str]]:
+    if path.startswith("gs://"):
+        trimmed = path[len("gs://"):]
+        bucket, _, object_name = trimmed.partition("/")
+        if bucket and object_name:
+            return bucket, object_name
+    settings = get_settings()
+    object_name = path.lstrip("/")
+    if settings.GCS_BUCKET_NAME and object_name:
+        return settings.GCS_BUCKET_NAME, object_name
+    return None
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _cache_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_settings().GCS_SIGNING_MAX_WORKERS,
+                    thread_name_prefix="url-signing",
+                )
+    return _executor
+
+
+def _signed_minutes(minutes: int) -> int:
+    # The expiry bucket is the requested lifetime: URLs are signed with extra
+    # headroom and reused while they still cover the full requested lifetime.
+    return minutes + int(minutes * get_settings().SIGNED_URL_CACHE_HEADROOM_RATIO)
+
+
+def sign_object(bucket: str, object_name: str, minutes: int = 30) -> str:
+    key = (bucket, object_name, minutes)
+    cache = get_cache()
+
+    url = cache.get(key, min_remaining_seconds=minutes * 60)
+    if url is not None:
+        cache_hits.inc()
+        return url
+
+    cache_misses.inc()
+    signed_minutes = _signed_minutes(minutes)
+    expires_at = time.time() + signed_minutes * 60
+    url = signed_get_url(bucket, object_name, minutes=signed_minutes)
+    cache.put(key, url, expires_at)
+    return url
+
+
+def _sign_batch(objects: list[tuple[str, str]], minutes: int) -> list[str]:
+    signer = get_signer()
+    if signer is not None:
+        try:
+            return generate_v4_signed_urls(signer, objects, expiration=timedelta(minutes=minutes))
+        except Exception:
+            logger.exception("Batch V4 signing failed, falling back to IAM signing")
+    return list(
+        _get_executor().map(
+            lambda obj: legacy_signed_get_url(obj[0], obj[1], minutes=minutes),
+            objects,
+        )
+    )
+
+
+def sign_many(paths: Iterable[Optional[str]], minutes: int = 30) -> dict[str, str]:
+    """Signs a page worth of media paths in one wave.
+
+    Paths are de-duplicated, cached URLs are reused and the remaining objects
+    are signed together. Returns a mapping of path to URL; look paths up with
+    ``urls.get(path)`` so empty paths resolve to ``None``.
+    """
+    urls: dict[str, str] = {}
+    pending: dict[tuple, list[str]] = {}
+    cache = get_cache()
+
+    for path in paths:
+        if not path or path in urls:
+            continue
+        if path.startswith("http://") or path.startswith("https://"):
+            urls[path] = path
+            continue
+        resolved = _resolve_object(path)
+        if resolved is None:
+            urls[path] = path
+            continue
+        key = (*resolved, minutes)
+        url = cache.get(key, min_remaining_seconds=minutes * 60)
+        if url is not None:
+            cache_hits.inc()
+            urls[path] = url
+        else:
+            pending.setdefault(key, []).append(path)
+
+    if pending:
+        cache_misses.inc(len(pending))
+        keys = list(pending)
+        signed_minutes = _signed_minutes(minutes)
+        expires_at = time.time() + signed_minutes * 60
+        signed = _sign_batch([(bucket, object_name) for bucket, object_name, _ in keys], signed_minutes)
+        for key, url in zip(keys, signed):
+            cache.put(key, url, expires_at)
+            for path in pending[key]:
+                urls[path] = url
+
+    return urls
+
+
+def signed_media_url(path: Optional[str], minutes: int = 30) -> Optional[str]:
+    if not path:
+        return None
+    if path.startswith("http://") or path.startswith("https://"):
+        return path
+    resolved = _resolve_object(path)
+    if resolved is None:
+        return path
+    bucket, object_name = resolved
+    return sign_object(bucket, object_name, minutes=minutes)
+
+
+def cache_stats() -> dict:
+    return {
+        "hits": cache_hits.value,
+        "misses": cache_misses.value,
+        "evictions": cache_evictions.value,
+        "size": len(get_cache()),
+    }
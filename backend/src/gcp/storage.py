@@ -1,28 +1,40 @@
-import google.auth
-from google.auth.transport import requests
+import logging
 from google.auth import compute_engine
 from datetime import datetime, timedelta
-from google.cloud import storage
 from fastapi import UploadFile
 
+from src.config import get_settings
+from src.gcp.clients import get_auth_request, get_storage_client
+from src.gcp.signers import generate_v4_signed_url, get_signer
+
+logger = logging.getLogger(__name__)
+
 
 def signed_get_url(bucket_name: str, object_name: str, minutes: int = 30):
-    # Get default credentials (Cloud Run service account)
-    auth_request = requests.Request()
-    credentials, project = google.auth.default()
+    signer = get_signer()
+    if signer is not None:
+        try:
+            return generate_v4_signed_url(
+                signer,
+                bucket_name,
+                object_name,
+                expiration=timedelta(minutes=minutes),
+            )
+        except Exception:
+            logger.exception("Local V4 signing failed, falling back to IAM signing")
+    return legacy_signed_get_url(bucket_name, object_name, minutes=minutes)
 
-    # Create storage client
-    storage_client = storage.Client(project=project, credentials=credentials)
 
-    bucket = storage_client.bucket(bucket_name)
+def legacy_signed_get_url(bucket_name: str, object_name: str, minutes: int = 30):
+    bucket = get_storage_client().bucket(bucket_name)
     blob = bucket.blob(object_name)
 
     # This is the important trick:
     # Use IDTokenCredentials to enable IAM-based signing
     signing_credentials = compute_engine.IDTokenCredentials(
-        auth_request,
+        get_auth_request(),
         "",
-        service_account_email='286573941342-compute@developer.gserviceaccount.com',
+        service_account_email=get_settings().GCS_SIGNING_SERVICE_ACCOUNT,
     )
 
     signed_url = blob.generate_signed_url(
@@ -40,8 +52,7 @@ def upload_upload_file_to_bucket(
     destination_blob_name: str,
     file: UploadFile,
 ) -> str:
-    storage_client = storage.Client()
-    bucket = storage_client.bucket(bucket_name)
+    bucket = get_storage_client().bucket(bucket_name)
     blob = bucket.blob(destination_blob_name)
     file.file.seek(0)
     blob.upload_from_file(file.file, content_type=file.content_type)
@@ -49,7 +60,6 @@ def upload_upload_file_to_bucket(
 
 
 def delete_object(bucket_name: str, object_name: str) -> None:
-    storage_client = storage.Client()
-    bucket = storage_client.bucket(bucket_name)
+    bucket = get_storage_client().bucket(bucket_name)
     blob = bucket.blob(object_name)
     blob.delete()
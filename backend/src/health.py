@@ -1,5 +1,8 @@
 from fastapi import APIRouter, Depends
 
+from src.metrics import Gauge, Histogram, snapshot
+from src.gcp.signing import cache_stats
+
 router = APIRouter()
 
 
@@ -11,4 +14,14 @@ def healthz():
 @router.get("/readyz", tags=["health"])
 def readyz():
     # later: check DB connectivity, pubsub, etc.
-    return {"status": "ready"}
\ No newline at end of file
+    return {"status": "ready"}
+
+
+@router.get("/metrics", tags=["health"])
+def metrics():
+    return {
+        "counters": snapshot(),
+        "gauges": snapshot(Gauge),
+        "histograms": snapshot(Histogram),
+        "signed_url_cache": cache_stats(),
+    }
@@ -3,7 +3,7 @@ from fastapi import FastAPI
 from starlette.middleware.sessions import SessionMiddleware
 import logging
 
-from src.db import create_db_and_tables
+from src.db import async_engine, create_db_and_tables
 from src.health import router as health_router
 from src.auth.router import router as auth_router
 from src.videos.router import router as videos_router
@@ -12,6 +12,13 @@ from src.user_interactions.router import router as interactions_router
 from src.feed.router import router as feed_router
 from src.videos.generation.router import router as video_generation_router
 from src.events.router import router as events_router
+from src.feed.async_router import router as async_feed_router
+from src.users.async_router import router as async_users_router
+from src.user_interactions.async_router import router as async_interactions_router
+from src.videos.generation.async_router import router as async_video_generation_router
+from src.events.broker import broker as job_event_broker
+from src.user_interactions.counters import flusher as counter_flusher
+from src.events.outbox import relay as outbox_relay
 from src.middleware import RequestIdMiddleware
 from src.logging import setup_logging
 from src.config import get_settings
@@ -65,9 +72,28 @@ def create_app() -> FastAPI:
     app.include_router(feed_router)
     app.include_router(video_generation_router)
     app.include_router(events_router)
+
+    # asyncpg-backed versions of the hot routes, served next to the threadpool
+    # ones so the two can be load tested against the same deployment
+    if settings.ASYNC_ROUTES_ENABLED:
+        app.include_router(async_feed_router, prefix="/async")
+        app.include_router(async_users_router, prefix="/async")
+        app.include_router(async_interactions_router, prefix="/async")
+        app.include_router(async_video_generation_router, prefix="/async")
+
+    @app.on_event("startup")
+    async def startup_event():
+        await job_event_broker.start()
+        await counter_flusher.start()
+        await outbox_relay.start()
+
     @app.on_event("shutdown")
-    def shutdown_event():
+    async def shutdown_event():
         logger.info("Shutting down application")
+        await job_event_broker.stop()
+        await counter_flusher.stop()
+        await outbox_relay.stop()
+        await async_engine.dispose()
 
     return app
 
@@ -0,0 +1,114 @@
+import bisect
+import threading
+from typing import Callable, Optional
+
+# seconds; suits both pool checkouts and outbound calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    def __init__(self, name: str):
+        self.name = name
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self):
+        return self._value
+
+
+class Gauge:
+    """A value that goes up and down, either set directly or read from
+    ``fn`` whenever a snapshot is taken."""
+
+    def __init__(self, name: str, fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.fn = fn
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        return self.fn() if self.fn is not None else self._value
+
+    def snapshot(self):
+        return self.value
+
+
+class Histogram:
+    def __init__(self, name: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self._count, self._sum
+        # cumulative, Prometheus style
+        buckets = {}
+        running = 0
+        for bound, n in zip(self.buckets, counts):
+            running += n
+            buckets[str(bound)] = running
+        buckets["+Inf"] = count
+        return {"count": count, "sum": total, "buckets": buckets}
+
+
+_registry: dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_or_create(name: str, factory):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = factory(name)
+            _registry[name] = metric
+        return metric
+
+
+def counter(name: str) -> Counter:
+    return _get_or_create(name, Counter)
+
+
+def gauge(name: str, fn: Optional[Callable[[], float]] = None) -> Gauge:
+    return _get_or_create(name, lambda n: Gauge(n, fn))
+
+
+def histogram(name: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return _get_or_create(name, lambda n: Histogram(n, buckets))
+
+
+def snapshot(kind: type = Counter) -> dict:
+    with _registry_lock:
+        metrics = [m for m in _registry.values() if isinstance(m, kind)]
+    return {metric.name: metric.snapshot() for metric in metrics}
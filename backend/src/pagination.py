@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from src.config import get_settings
+
+
+def _serializer(salt: str) -> URLSafeSerializer:
+    return URLSafeSerializer(get_settings().SECRET_KEY, salt=salt)
+
+
+def encode_cursor(salt: str, *values: Any) -> str:
+    """Encodes keyset values into an opaque, signed page token.
+
+    Datetimes are stored as ISO strings and restored by ``decode_cursor``.
+    """
+    encoded = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return _serializer(salt).dumps(encoded)
+
+
+def decode_cursor(salt: str, token: Optional[str], *types: type) -> Optional[tuple]:
+    if not token:
+        return None
+    try:
+        values = _serializer(salt).loads(token)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v)
+            for v, t in zip(values, types)
+        )
+    except (BadSignature, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid page token")
@@ -0,0 +1,50 @@
+"""Connection pool telemetry for the SQLAlchemy engines.
+
+Checkout latency covers the whole ``pool.connect()``: waiting for a free
+connection, opening a new one when the pool may overflow, and the pre-ping.
+A steadily growing tail means Cloud Run concurrency is outpacing the pool.
+"""
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+from src.metrics import counter, gauge, histogram
+
+
+class _InstrumentedPool:
+    metrics_name = "db"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            counter(f"{self.metrics_name}_pool_checkout_timeouts").inc()
+            raise
+        finally:
+            histogram(f"{self.metrics_name}_pool_checkout_seconds").observe(time.perf_counter() - start)
+
+
+def instrumented_pool_class(base: type[Pool], name: str) -> type[Pool]:
+    """``base`` with checkout timing, for ``create_engine(poolclass=...)``.
+
+    A subclass rather than pool events because SQLAlchemy has no event for
+    the start of a checkout, only for its end.
+    """
+    return type(f"Instrumented{base.__name__}", (_InstrumentedPool, base), {"metrics_name": name})
+
+
+def register_pool_gauges(name: str, engine: Engine) -> None:
+    # read engine.pool lazily: dispose() swaps in a fresh pool
+    def pool() -> QueuePool:
+        return engine.pool
+
+    gauge(f"{name}_pool_size", lambda: pool().size())
+    gauge(f"{name}_pool_checked_out", lambda: pool().checkedout())
+    gauge(f"{name}_pool_checked_in", lambda: pool().checkedin())
+    # QueuePool.overflow() counts from -pool_size while the core pool fills
+    gauge(f"{name}_pool_overflow", lambda: max(pool().overflow(), 0))
+    counter(f"{name}_pool_checkout_timeouts")
+    histogram(f"{name}_pool_checkout_seconds")
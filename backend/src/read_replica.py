@@ -0,0 +1,199 @@
+"""Routing of read-only sessions to a Postgres read replica.
+
+A ``ReadSession`` picks its connection on first use:
+
+- the primary, if the requesting user committed a write within the last
+  ``READ_YOUR_WRITES_SECONDS`` (so they see their own like, comment or follow);
+- the primary, if the replica's replay lag is above ``READ_REPLICA_MAX_LAG_SECONDS``
+  or the lag check itself fails;
+- the replica otherwise.
+
+Writes are recorded by session events on the primary sessions, keyed by the
+user id that ``get_session`` stores in ``session.info``.
+"""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from src.config import get_settings
+from src.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+replica_reads = counter("db_read_replica_reads")
+primary_reads_sticky = counter("db_read_primary_reads_sticky")
+primary_reads_lagging = counter("db_read_primary_reads_lagging")
+
+# 0 while the replica has replayed everything it received, so an idle primary
+# does not look like lag
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaLagMonitor:
+    """Replication lag, measured at most once per ``check_interval`` per process."""
+
+    def __init__(self, engine: Engine, max_lag_seconds: float, check_interval: float):
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.lag_seconds: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _measure(self) -> Optional[float]:
+        try:
+            with self.engine.connect() as conn:
+                return float(conn.execute(REPLICA_LAG_SQL).scalar_one())
+        except Exception:
+            logger.exception("Read replica lag check failed")
+            return None
+
+    def is_usable(self) -> bool:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            # one thread refreshes; the others keep using the last reading
+            if self._lock.acquire(blocking=False):
+                try:
+                    self.lag_seconds = self._measure()
+                    self._checked_at = time.monotonic()
+                finally:
+                    self._lock.release()
+        lag = self.lag_seconds
+        return lag is not None and lag <= self.max_lag_seconds
+
+
+class RecentWriters(ABC):
+    @abstractmethod
+    def mark(self, user_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def wrote_recently(self, user_id: int) -> bool:
+        pass
+
+
+class InMemoryRecentWriters(RecentWriters):
+    """Per-process only; a user whose next read lands on another instance
+    may still hit the replica."""
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._until: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+
+    def mark(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            self._until[user_id] = now + self.window_seconds
+            if now >= self._next_prune:
+                self._until = {k: v for k, v in self._until.items() if v > now}
+                self._next_prune = now + self.window_seconds
+
+    def wrote_recently(self, user_id):
+        until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+
+class RedisRecentWriters(RecentWriters):
+    def __init__(self, client, window_seconds: float):
+        self.client = client
+        self.window_ms = int(window_seconds * 1000)
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"recent_write:{user_id}"
+
+    def mark(self, user_id):
+        self.client.set(self._key(user_id), 1, px=self.window_ms)
+
+    def wrote_recently(self, user_id):
+        return bool(self.client.exists(self._key(user_id)))
+
+
+_writers: Optional[RecentWriters] = None
+
+
+def get_recent_writers() -> RecentWriters:
+    global _writers
+    if _writers is None:
+        settings = get_settings()
+        if settings.READ_YOUR_WRITES_BACKEND.lower() == "redis":
+            from src.redis_client import get_redis
+
+            _writers = RedisRecentWriters(get_redis(), settings.READ_YOUR_WRITES_SECONDS)
+        else:
+            _writers = InMemoryRecentWriters(settings.READ_YOUR_WRITES_SECONDS)
+    return _writers
+
+
+class ReadSession(Session):
+    """Session for read-only request handlers; never flush through it."""
+
+    def __init__(self, primary: Engine, replica: Engine, monitor: ReplicaLagMonitor, user_id: Optional[int] = None):
+        super().__init__(primary)
+        self.primary = primary
+        self.replica = replica
+        self.monitor = monitor
+        self.user_id = user_id
+        self._read_bind: Optional[Engine] = None
+
+    def _choose_bind(self) -> Engine:
+        if self.user_id is not None and get_recent_writers().wrote_recently(self.user_id):
+            primary_reads_sticky.inc()
+            return self.primary
+        if not self.monitor.is_usable():
+            primary_reads_lagging.inc()
+            return self.primary
+        replica_reads.inc()
+        return self.replica
+
+    def get_bind(self, mapper=None, *, clause=None, bind=None, **kw):
+        # pinned for the session so one response never mixes both databases
+        if self._read_bind is None:
+            self._read_bind = self._choose_bind()
+        return self._read_bind
+
+
+def register_lag_gauge(monitor: ReplicaLagMonitor) -> None:
+    gauge("db_replica_lag_seconds", lambda: monitor.lag_seconds if monitor.lag_seconds is not None else -1)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush_writes(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_recent_writer(session):
+    wrote = session.info.pop("wrote", False)
+    user_id = session.info.get("user_id")
+    if wrote and user_id is not None:
+        try:
+            get_recent_writers().mark(user_id)
+        except Exception:
+            logger.exception("Failed to record write for user %s", user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("wrote", None)
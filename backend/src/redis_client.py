@@ -0,0 +1,13 @@
+from functools import lru_cache
+
+from src.config import get_settings
+
+
+@lru_cache
+def get_redis():
+    import redis
+
+    settings = get_settings()
+    if not settings.REDIS_URL:
+        raise RuntimeError("REDIS_URL must be set to use a Redis backend")
+    return redis.Redis.from_url(settings.REDIS_URL)
@@ -0,0 +1,121 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional
+
+from src.db import get_async_session
+from src.auth.utils import get_current_user_claims
+from src.user_interactions.schema import (
+    CommentSchema,
+    CommentRepliesSchema,
+    CommentThreadsSchema,
+    InteractionStatesSchema,
+    PostCommentSchema,
+)
+from src.user_interactions.router import MAX_STATE_VIDEO_IDS
+from src.user_interactions.service import (
+    like_video_async,
+    unlike_video_async,
+    comment_on_video_async,
+    get_comment_threads_async,
+    get_comment_replies_async,
+    get_interaction_states_async,
+    delete_user_comment_async,
+)
+
+router = APIRouter(prefix="/interactions", tags=["user_interactions"])
+
+
+@router.get("/state", response_model=InteractionStatesSchema)
+async def get_state(
+    video_ids: list[int] = Query(..., min_length=1, max_length=MAX_STATE_VIDEO_IDS),
+    session: AsyncSession = Depends(get_async_session),
+    current_user=Depends(get_current_user_claims),
+):
+    """Counts and the caller's like/comment state for up to 100 videos."""
+    return await get_interaction_states_async(
+        session=session,
+        user_id=current_user.id,
+        video_ids=video_ids,
+    )
+
+
+@router.post("/{video_id}/like", status_code=status.HTTP_201_CREATED)
+async def like(
+    video_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user=Depends(get_current_user_claims),
+):
+    if not await like_video_async(session=session, user_id=current_user.id, video_id=video_id):
+        raise HTTPException(status_code=400, detail="Already liked")
+
+
+@router.delete("/{video_id}/like", status_code=status.HTTP_204_NO_CONTENT)
+async def unlike(
+    video_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user=Depends(get_current_user_claims),
+):
+    if not await unlike_video_async(session=session, user_id=current_user.id, video_id=video_id):
+        raise HTTPException(status_code=400, detail="Not liked")
+
+
+@router.post("/{video_id}/comment", response_model=CommentSchema, status_code=201)
+async def post_comment(
+    video_id: int,
+    data: PostCommentSchema,
+    session: AsyncSession = Depends(get_async_session),
+    current_user=Depends(get_current_user_claims),
+):
+    return await comment_on_video_async(
+        session=session,
+        user_id=current_user.id,
+        video_id=video_id,
+        content=data.comment_text,
+        parent_comment_id=data.parent_comment_id,
+    )
+
+
+@router.get("/{video_id}/comments", response_model=CommentThreadsSchema)
+async def get_comments(
+    video_id: int,
+    page_token: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=50),
+    replies: int = Query(default=3, ge=0, le=10),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await get_comment_threads_async(
+        session=session,
+        video_id=video_id,
+        limit=limit,
+        replies=replies,
+        page_token=page_token,
+    )
+
+
+@router.get("/comment/{comment_id}/replies", response_model=CommentRepliesSchema)
+async def get_replies(
+    comment_id: int,
+    page_token: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=50),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await get_comment_replies_async(
+        session=session,
+        comment_id=comment_id,
+        limit=limit,
+        page_token=page_token,
+    )
+
+
+@router.delete("/comment/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_comment(
+    comment_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user=Depends(get_current_user_claims),
+):
+    if not await delete_user_comment_async(
+        session=session,
+        comment_id=comment_id,
+        user_id=current_user.id,
+    ):
+        raise HTTPException(status_code=404, detail="Comment not found or not yours")
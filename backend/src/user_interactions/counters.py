@@ -0,0 +1,210 @@
+"""Write-behind like/comment counters.
+
+Interactions insert a row into ``video_counter_deltas`` in their own
+transaction; ``CounterFlusher`` periodically folds a batch of deltas into
+``videos`` with one UPDATE per touched video. Reads add the still-pending
+deltas, so counts stay exact while the hot ``videos`` row is written at most
+once per flush instead of once per like.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import func, insert, literal, text
+from sqlmodel import Session, select
+
+from src.config import get_settings
+from src.metrics import counter, histogram
+from src.user_interactions.models import VideoCounterDelta
+from src.videos.models import Video
+
+logger = logging.getLogger(__name__)
+
+deltas_flushed = counter("video_counter_deltas_flushed")
+flush_seconds = histogram("video_counter_flush_seconds")
+
+# pg_try_advisory_xact_lock key; one flusher at a time across all instances,
+# so concurrent flushers can never deadlock on the videos rows they update
+FLUSH_LOCK_KEY = 7_301_013
+
+FLUSH_SQL = text(
+    """
+    WITH batch AS (
+        DELETE FROM video_counter_deltas
+        WHERE id IN (
+            SELECT id FROM video_counter_deltas
+            ORDER BY id
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING video_id, likes_delta, comments_delta
+    ),
+    totals AS (
+        SELECT video_id,
+               SUM(likes_delta) AS likes,
+               SUM(comments_delta) AS comments
+        FROM batch
+        GROUP BY video_id
+    ),
+    applied AS (
+        UPDATE videos
+        SET likes_count = GREATEST(videos.likes_count + totals.likes, 0),
+            comments_count = GREATEST(videos.comments_count + totals.comments, 0)
+        FROM totals
+        WHERE videos.id = totals.video_id
+        RETURNING videos.id
+    )
+    SELECT (SELECT count(*) FROM batch), (SELECT count(*) FROM applied)
+    """
+)
+
+
+def counter_delta(video_id: int, likes: int = 0, comments: int = 0):
+    """INSERT for a pending count change; execute it in the interaction's
+    transaction."""
+    return insert(VideoCounterDelta).values(
+        video_id=video_id,
+        likes_delta=likes,
+        comments_delta=comments,
+    )
+
+
+def counter_delta_from(changed, likes: int = 0, comments: int = 0):
+    """INSERT of one delta per row of ``changed``, a DML CTE returning
+    ``video_id``; nothing is recorded when the CTE changed no rows."""
+    return (
+        insert(VideoCounterDelta)
+        .from_select(
+            ["video_id", "likes_delta", "comments_delta"],
+            select(changed.c.video_id, literal(likes), literal(comments)),
+            include_defaults=False,
+        )
+        .returning(VideoCounterDelta.id)
+    )
+
+
+def _pending(column):
+    return (
+        select(func.coalesce(func.sum(column), 0))
+        .where(VideoCounterDelta.video_id == Video.id)
+        .correlate(Video)
+        .scalar_subquery()
+    )
+
+
+def likes_count_expr():
+    """``Video.likes_count`` including unflushed deltas, for select lists."""
+    return func.greatest(Video.likes_count + _pending(VideoCounterDelta.likes_delta), 0)
+
+
+def comments_count_expr():
+    return func.greatest(Video.comments_count + _pending(VideoCounterDelta.comments_delta), 0)
+
+
+def pending_counts(session: Session, video_ids: Iterable[int]) -> dict[int, tuple[int, int]]:
+    """Unflushed (likes, comments) deltas per video, for already-loaded rows."""
+    video_ids = list(set(video_ids))
+    if not video_ids:
+        return {}
+    rows = session.exec(
+        select(
+            VideoCounterDelta.video_id,
+            func.sum(VideoCounterDelta.likes_delta),
+            func.sum(VideoCounterDelta.comments_delta),
+        )
+        .where(VideoCounterDelta.video_id.in_(video_ids))
+        .group_by(VideoCounterDelta.video_id)
+    ).all()
+    return {video_id: (int(likes), int(comments)) for video_id, likes, comments in rows}
+
+
+def current_counts(video: Video, pending: dict[int, tuple[int, int]]) -> tuple[int, int]:
+    likes, comments = pending.get(video.id, (0, 0))
+    return max(video.likes_count + likes, 0), max(video.comments_count + comments, 0)
+
+
+def flush_counters(session: Session, batch_size: int) -> int:
+    """Applies up to ``batch_size`` deltas and commits; returns how many were
+    applied, or 0 when another flusher holds the lock."""
+    locked = session.exec(
+        select(func.pg_try_advisory_xact_lock(FLUSH_LOCK_KEY))
+    ).one()
+    if not locked:
+        session.rollback()
+        return 0
+    applied, videos = session.execute(FLUSH_SQL, {"batch_size": batch_size}).one()
+    session.commit()
+    if applied:
+        deltas_flushed.inc(applied)
+        logger.debug("Flushed %s counter deltas into %s videos", applied, videos)
+    return applied
+
+
+def flush_pending(batch_size: int) -> int:
+    """Flushes until the backlog is drained; returns the number applied."""
+    from src.db import engine
+
+    total = 0
+    while True:
+        start = time.perf_counter()
+        with Session(engine) as session:
+            applied = flush_counters(session, batch_size)
+        flush_seconds.observe(time.perf_counter() - start)
+        total += applied
+        if applied < batch_size:
+            return total
+
+
+class CounterFlusher:
+    """Background task that drains ``video_counter_deltas`` every
+    ``interval`` seconds."""
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        logger.info("Flushing video counters every %ss", self.interval)
+        while True:
+            try:
+                await asyncio.to_thread(flush_pending, self.batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Video counter flush failed")
+            await asyncio.sleep(self.interval)
+
+
+_settings = get_settings()
+flusher = CounterFlusher(
+    interval=_settings.COUNTER_FLUSH_INTERVAL_SECONDS,
+    batch_size=_settings.COUNTER_FLUSH_BATCH_SIZE,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending video counter deltas")
+    parser.add_argument("--batch-size", type=int, default=_settings.COUNTER_FLUSH_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print(f"Applied {flush_pending(args.batch_size)} counter deltas")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,8 @@ class Like(SQLModel, table=True):
     __tablename__ = "likes"
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="users.id", index=True)
+    # leading column of uq_likes_user_id_video_id, so no separate index
+    user_id: int = Field(foreign_key="users.id")
     video_id: int = Field(foreign_key="videos.id", index=True)
 
     created_at: datetime = Field(
@@ -22,16 +23,28 @@ class Like(SQLModel, table=True):
     )
 
     __table_args__ = (
+        sa.Index("uq_likes_user_id_video_id", "user_id", "video_id", unique=True),
         {"sqlite_autoincrement": True},
     )
 
 
 class Comment(SQLModel, table=True):
     __tablename__ = "comments"
+    __table_args__ = (
+        # threads: top-level comments (parent NULL) and each comment's
+        # replies, both in keyset order; also serves plain video_id lookups
+        sa.Index(
+            "ix_comments_video_parent_created_at_id",
+            "video_id",
+            "parent_comment_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
-    video_id: int = Field(foreign_key="videos.id", index=True)
+    video_id: int = Field(foreign_key="videos.id")
     parent_comment_id: Optional[int] = Field(default=None, foreign_key="comments.id")
 
     content: str
@@ -42,3 +55,31 @@ class Comment(SQLModel, table=True):
             "server_default": sa.func.now(),
         },
     )
+
+
+class VideoCounterDelta(SQLModel, table=True):
+    """Pending change to a video's like/comment counts.
+
+    Interactions append here instead of updating the ``videos`` row, so
+    concurrent likes on one video do not queue on its row lock; the counter
+    flusher folds these into ``videos`` in batches.
+    """
+
+    __tablename__ = "video_counter_deltas"
+
+    id: Optional[int] = Field(
+        default=None,
+        primary_key=True,
+        sa_type=sa.BigInteger,
+    )
+    video_id: int = Field(foreign_key="videos.id", index=True)
+    likes_delta: int = Field(default=0)
+    comments_delta: int = Field(default=0)
+
+    created_at: datetime = Field(
+        default_factory=utcnow,
+        sa_type=sa.DateTime(timezone=True),
+        sa_column_kwargs={
+            "server_default": sa.func.now(),
+        },
+    )
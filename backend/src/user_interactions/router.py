@@ -1,24 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session
+from typing import Optional
 
-from src.db import get_session
-from src.auth.utils import get_current_user
-from src.user_interactions.schema import CommentSchema, PostCommentSchema
+from src.db import get_read_session, get_session
+from src.auth.utils import get_current_user_claims
+from src.user_interactions.schema import (
+    CommentSchema,
+    CommentRepliesSchema,
+    CommentThreadsSchema,
+    InteractionStatesSchema,
+    PostCommentSchema,
+)
 from src.user_interactions.service import (
     like_video,
     unlike_video,
     comment_on_video,
-    get_comments_data,
+    get_comment_threads,
+    get_comment_replies,
+    get_interaction_states,
     delete_user_comment,
 )
 
 router = APIRouter(prefix="/interactions", tags=["user_interactions"])
 
+MAX_STATE_VIDEO_IDS = 100
+
+
+@router.get("/state", response_model=InteractionStatesSchema)
+def get_state(
+    video_ids: list[int] = Query(..., min_length=1, max_length=MAX_STATE_VIDEO_IDS),
+    session: Session = Depends(get_read_session),
+    current_user=Depends(get_current_user_claims),
+):
+    """Counts and the caller's like/comment state for up to 100 videos."""
+    return get_interaction_states(
+        session=session,
+        user_id=current_user.id,
+        video_ids=video_ids,
+    )
+
+
 @router.post("/{video_id}/like", status_code=status.HTTP_201_CREATED)
 def like(
     video_id: int,
     session: Session = Depends(get_session),
-    current_user=Depends(get_current_user),
+    current_user=Depends(get_current_user_claims),
 ):
     if not like_video(session=session, user_id=current_user.id, video_id=video_id):
         raise HTTPException(status_code=400, detail="Already liked")
@@ -28,7 +54,7 @@ def like(
 def unlike(
     video_id: int,
     session: Session = Depends(get_session),
-    current_user=Depends(get_current_user),
+    current_user=Depends(get_current_user_claims),
 ):
     if not unlike_video(session=session, user_id=current_user.id, video_id=video_id):
         raise HTTPException(status_code=400, detail="Not liked")
@@ -39,7 +65,7 @@ def post_comment(
     video_id: int,
     data: PostCommentSchema,
     session: Session = Depends(get_session),
-    current_user=Depends(get_current_user),
+    current_user=Depends(get_current_user_claims),
 ):
     return comment_on_video(
         session=session,
@@ -50,19 +76,43 @@ def post_comment(
     )
 
 
-@router.get("/{video_id}/comments", response_model=list[CommentSchema])
+@router.get("/{video_id}/comments", response_model=CommentThreadsSchema)
 def get_comments(
     video_id: int,
-    session: Session = Depends(get_session),
+    page_token: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=50),
+    replies: int = Query(default=3, ge=0, le=10),
+    session: Session = Depends(get_read_session),
 ):
-    return get_comments_data(session=session, video_id=video_id)
+    return get_comment_threads(
+        session=session,
+        video_id=video_id,
+        limit=limit,
+        replies=replies,
+        page_token=page_token,
+    )
+
+
+@router.get("/comment/{comment_id}/replies", response_model=CommentRepliesSchema)
+def get_replies(
+    comment_id: int,
+    page_token: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=50),
+    session: Session = Depends(get_read_session),
+):
+    return get_comment_replies(
+        session=session,
+        comment_id=comment_id,
+        limit=limit,
+        page_token=page_token,
+    )
 
 
 @router.delete("/comment/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_comment(
     comment_id: int,
     session: Session = Depends(get_session),
-    current_user=Depends(get_current_user),
+    current_user=Depends(get_current_user_claims),
 ):
     if not delete_user_comment(
         session=session,
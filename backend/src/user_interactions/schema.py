@@ -22,3 +22,34 @@ class CommentSchema(BaseModel):
     model_config = {
         "from_attributes": True
     }
+
+
+class CommentThreadSchema(CommentSchema):
+    # the first replies, oldest first; when has_more_replies is set, page on
+    # with next_replies_token (absent if no replies were inlined)
+    replies: list[CommentSchema] = []
+    has_more_replies: bool = False
+    next_replies_token: Optional[str] = None
+
+
+class CommentThreadsSchema(BaseModel):
+    items: list[CommentThreadSchema]
+    next_page_token: Optional[str] = None
+
+
+class CommentRepliesSchema(BaseModel):
+    items: list[CommentSchema]
+    next_page_token: Optional[str] = None
+
+
+class InteractionStateSchema(BaseModel):
+    video_id: int
+    owner_id: int
+    likes_count: int
+    comments_count: int
+    is_liked_by_user: bool
+    has_commented: bool
+
+
+class InteractionStatesSchema(BaseModel):
+    items: list[InteractionStateSchema]
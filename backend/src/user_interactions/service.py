@@ -1,50 +1,68 @@
 from sqlmodel import Session, select
-from sqlalchemy import update
+from sqlmodel.ext.asyncio.session import AsyncSession
+import sqlalchemy as sa
+from sqlalchemy import any_, delete, func, true, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased
+from typing import Optional
+from datetime import datetime
 
 from src.user_interactions.models import Like, Comment
+from src.user_interactions.counters import (
+    comments_count_expr,
+    counter_delta,
+    counter_delta_from,
+    likes_count_expr,
+)
+from src.videos.enums import VideoStatus
 from src.videos.models import Video
+from src.user_interactions.schema import (
+    CommentSchema,
+    CommentRepliesSchema,
+    CommentThreadSchema,
+    CommentThreadsSchema,
+    InteractionStateSchema,
+    InteractionStatesSchema,
+)
+from src.pagination import encode_cursor, decode_cursor
 
+COMMENTS_CURSOR_SALT = "comments"
+REPLIES_CURSOR_SALT = "comment_replies"
 
-def like_video(*, session: Session, user_id: int, video_id: int) -> bool:
-    exists = session.exec(
-        select(Like).where(
-            Like.user_id == user_id,
-            Like.video_id == video_id,
-        )
-    ).first()
 
-    if exists:
-        return False
+def _like_stmt(user_id: int, video_id: int):
+    liked = (
+        pg_insert(Like)
+        .values(user_id=user_id, video_id=video_id, created_at=func.now())
+        .on_conflict_do_nothing(index_elements=["user_id", "video_id"])
+        .returning(Like.video_id)
+        .cte("liked")
+    )
+    return counter_delta_from(liked, likes=1)
 
-    session.add(Like(user_id=user_id, video_id=video_id))
-    session.exec(
-        update(Video)
-        .where(Video.id == video_id)
-        .values(likes_count=Video.likes_count + 1)
+
+def _unlike_stmt(user_id: int, video_id: int):
+    unliked = (
+        delete(Like)
+        .where(Like.user_id == user_id, Like.video_id == video_id)
+        .returning(Like.video_id)
+        .cte("unliked")
     )
-    session.commit()
-    return True
+    return counter_delta_from(unliked, likes=-1)
 
 
-def unlike_video(*, session: Session, user_id: int, video_id: int) -> bool:
-    like = session.exec(
-        select(Like).where(
-            Like.user_id == user_id,
-            Like.video_id == video_id,
-        )
-    ).first()
+def like_video(*, session: Session, user_id: int, video_id: int) -> bool:
+    # one round trip; the counter only moves when the like row was inserted
+    changed = session.exec(_like_stmt(user_id, video_id)).first()
+    session.commit()
+    return changed is not None
 
-    if not like:
-        return False
 
-    session.delete(like)
-    session.exec(
-        update(Video)
-        .where(Video.id == video_id, Video.likes_count > 0)
-        .values(likes_count=Video.likes_count - 1)
-    )
+def unlike_video(*, session: Session, user_id: int, video_id: int) -> bool:
+    changed = session.exec(_unlike_stmt(user_id, video_id)).first()
     session.commit()
-    return True
+    return changed is not None
 
 
 def comment_on_video(
@@ -63,24 +81,184 @@ def comment_on_video(
     )
     session.add(comment)
 
-    session.exec(
-        update(Video)
-        .where(Video.id == video_id)
-        .values(comments_count=Video.comments_count + 1)
-    )
+    session.exec(counter_delta(video_id, comments=1))
 
     session.commit()
     session.refresh(comment)
     return comment
 
 
-def get_comments_data(*, session: Session, video_id: int) -> list[Comment]:
-    stmt = (
+def _page_after(stmt, cursor):
+    if cursor:
+        stmt = stmt.where(
+            tuple_(Comment.created_at, Comment.id)
+            > tuple_(*cursor, types=[Comment.created_at.type, Comment.id.type])
+        )
+    return stmt
+
+
+def _threads_stmt(video_id: int, cursor, limit: int, replies: int):
+    # Top-level comments in creation order, each joined to at most
+    # ``replies + 1`` of its replies (the extra one says whether there are
+    # more). Both sides walk ix_comments_video_parent_created_at_id.
+    top = (
+        _page_after(
+            select(Comment).where(
+                Comment.video_id == video_id,
+                Comment.parent_comment_id.is_(None),
+            ),
+            cursor,
+        )
+        .order_by(Comment.created_at, Comment.id)
+        .limit(limit + 1)
+        .subquery("top")
+    )
+    Top = aliased(Comment, top)
+    first_replies = (
         select(Comment)
-        .where(Comment.video_id == video_id)
-        .order_by(Comment.created_at.asc())
+        .where(Comment.video_id == video_id, Comment.parent_comment_id == Top.id)
+        .order_by(Comment.created_at, Comment.id)
+        .limit(replies + 1)
+        .lateral("first_replies")
     )
-    return session.exec(stmt).all()
+    Reply = aliased(Comment, first_replies)
+    return (
+        select(Top, Reply)
+        .outerjoin(Reply, true())
+        .order_by(Top.created_at, Top.id, Reply.created_at, Reply.id)
+    )
+
+
+def _build_threads(rows, limit: int, replies: int) -> CommentThreadsSchema:
+    threads: dict[int, tuple[Comment, list[Comment]]] = {}
+    for top, reply in rows:
+        _, thread_replies = threads.setdefault(top.id, (top, []))
+        if reply is not None:
+            thread_replies.append(reply)
+
+    tops = list(threads.values())
+    next_page_token = None
+    if len(tops) > limit:
+        tops = tops[:limit]
+        last = tops[-1][0]
+        next_page_token = encode_cursor(COMMENTS_CURSOR_SALT, last.created_at, last.id)
+
+    items = []
+    for top, thread_replies in tops:
+        has_more_replies = len(thread_replies) > replies
+        next_replies_token = None
+        thread_replies = thread_replies[:replies]
+        if has_more_replies and thread_replies:
+            last = thread_replies[-1]
+            next_replies_token = encode_cursor(REPLIES_CURSOR_SALT, last.created_at, last.id)
+        items.append(
+            CommentThreadSchema(
+                **CommentSchema.model_validate(top).model_dump(),
+                replies=[CommentSchema.model_validate(r) for r in thread_replies],
+                has_more_replies=has_more_replies,
+                next_replies_token=next_replies_token,
+            )
+        )
+    return CommentThreadsSchema(items=items, next_page_token=next_page_token)
+
+
+def _replies_stmt(comment_id: int, cursor, limit: int):
+    # the parent's video_id keeps the lookup on the composite index
+    Parent = aliased(Comment)
+    parent_video_id = (
+        select(Parent.video_id).where(Parent.id == comment_id).scalar_subquery()
+    )
+    return (
+        _page_after(
+            select(Comment).where(
+                Comment.video_id == parent_video_id,
+                Comment.parent_comment_id == comment_id,
+            ),
+            cursor,
+        )
+        .order_by(Comment.created_at, Comment.id)
+        .limit(limit + 1)
+    )
+
+
+def _build_replies(rows, limit: int) -> CommentRepliesSchema:
+    next_page_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_page_token = encode_cursor(REPLIES_CURSOR_SALT, last.created_at, last.id)
+    return CommentRepliesSchema(
+        items=[CommentSchema.model_validate(r) for r in rows],
+        next_page_token=next_page_token,
+    )
+
+
+def _interaction_states_stmt(user_id: int, video_ids: list[int]):
+    # one array parameter, so the plan is the same for any page size, and
+    # both lookups stay on the user's index entries
+    ids = sa.bindparam("video_ids", video_ids, type_=ARRAY(sa.Integer))
+    liked = select(Like.video_id).where(Like.user_id == user_id, Like.video_id == any_(ids))
+    commented = select(Comment.video_id).where(Comment.user_id == user_id, Comment.video_id == any_(ids))
+    return select(
+        Video.id,
+        Video.user_id,
+        likes_count_expr(),
+        comments_count_expr(),
+        Video.id.in_(liked),
+        Video.id.in_(commented),
+    ).where(Video.id == any_(ids), Video.status == VideoStatus.READY)
+
+
+def _build_interaction_states(rows, video_ids: list[int]) -> InteractionStatesSchema:
+    by_id = {
+        row[0]: InteractionStateSchema(
+            video_id=row[0],
+            owner_id=row[1],
+            likes_count=row[2],
+            comments_count=row[3],
+            is_liked_by_user=row[4],
+            has_commented=row[5],
+        )
+        for row in rows
+    }
+    # request order; unknown or unpublished ids are left out
+    return InteractionStatesSchema(items=[by_id[i] for i in video_ids if i in by_id])
+
+
+def get_interaction_states(
+    *,
+    session: Session,
+    user_id: int,
+    video_ids: list[int],
+) -> InteractionStatesSchema:
+    video_ids = list(dict.fromkeys(video_ids))
+    rows = session.exec(_interaction_states_stmt(user_id, video_ids)).all()
+    return _build_interaction_states(rows, video_ids)
+
+
+def get_comment_threads(
+    *,
+    session: Session,
+    video_id: int,
+    limit: int = 20,
+    replies: int = 3,
+    page_token: Optional[str] = None,
+) -> CommentThreadsSchema:
+    cursor = decode_cursor(COMMENTS_CURSOR_SALT, page_token, datetime, int)
+    rows = session.exec(_threads_stmt(video_id, cursor, limit, replies)).all()
+    return _build_threads(rows, limit, replies)
+
+
+def get_comment_replies(
+    *,
+    session: Session,
+    comment_id: int,
+    limit: int = 20,
+    page_token: Optional[str] = None,
+) -> CommentRepliesSchema:
+    cursor = decode_cursor(REPLIES_CURSOR_SALT, page_token, datetime, int)
+    rows = session.exec(_replies_stmt(comment_id, cursor, limit)).all()
+    return _build_replies(rows, limit)
 
 
 def delete_user_comment(
@@ -96,17 +274,115 @@ def delete_user_comment(
     # orphan children
     session.exec(
         update(Comment)
-        .where(Comment.parent_comment_id == comment_id)
+        .where(
+            Comment.video_id == comment.video_id,
+            Comment.parent_comment_id == comment_id,
+        )
         .values(parent_comment_id=None)
     )
 
     session.delete(comment)
 
-    session.exec(
-        update(Video)
-        .where(Video.id == comment.video_id, Video.comments_count > 0)
-        .values(comments_count=Video.comments_count - 1)
-    )
+    session.exec(counter_delta(comment.video_id, comments=-1))
 
     session.commit()
     return True
+
+
+async def like_video_async(*, session: AsyncSession, user_id: int, video_id: int) -> bool:
+    changed = (await session.exec(_like_stmt(user_id, video_id))).first()
+    await session.commit()
+    return changed is not None
+
+
+async def unlike_video_async(*, session: AsyncSession, user_id: int, video_id: int) -> bool:
+    changed = (await session.exec(_unlike_stmt(user_id, video_id))).first()
+    await session.commit()
+    return changed is not None
+
+
+async def comment_on_video_async(
+    *,
+    session: AsyncSession,
+    user_id: int,
+    video_id: int,
+    content: str,
+    parent_comment_id: int | None = None,
+) -> Comment:
+    comment = Comment(
+        user_id=user_id,
+        video_id=video_id,
+        content=content,
+        parent_comment_id=parent_comment_id,
+    )
+    session.add(comment)
+
+    await session.exec(counter_delta(video_id, comments=1))
+
+    await session.commit()
+    await session.refresh(comment)
+    return comment
+
+
+async def get_interaction_states_async(
+    *,
+    session: AsyncSession,
+    user_id: int,
+    video_ids: list[int],
+) -> InteractionStatesSchema:
+    video_ids = list(dict.fromkeys(video_ids))
+    rows = (await session.exec(_interaction_states_stmt(user_id, video_ids))).all()
+    return _build_interaction_states(rows, video_ids)
+
+
+async def get_comment_threads_async(
+    *,
+    session: AsyncSession,
+    video_id: int,
+    limit: int = 20,
+    replies: int = 3,
+    page_token: Optional[str] = None,
+) -> CommentThreadsSchema:
+    cursor = decode_cursor(COMMENTS_CURSOR_SALT, page_token, datetime, int)
+    rows = (await session.exec(_threads_stmt(video_id, cursor, limit, replies))).all()
+    return _build_threads(rows, limit, replies)
+
+
+async def get_comment_replies_async(
+    *,
+    session: AsyncSession,
+    comment_id: int,
+    limit: int = 20,
+    page_token: Optional[str] = None,
+) -> CommentRepliesSchema:
+    cursor = decode_cursor(REPLIES_CURSOR_SALT, page_token, datetime, int)
+    rows = (await session.exec(_replies_stmt(comment_id, cursor, limit))).all()
+    return _build_replies(rows, limit)
+
+
+async def delete_user_comment_async(
+    *,
+    session: AsyncSession,
+    comment_id: int,
+    user_id: int,
+) -> bool:
+    comment = await session.get(Comment, comment_id)
+    if not comment or comment.user_id != user_id:
+        return False
+
+    # orphan children
+    await session.exec(
+        update(Comment)
+        .where(
+            Comment.video_id == comment.video_id,
+            Comment.parent_comment_id == comment_id,
+        )
+        .values(parent_comment_id=None)
+    )
+
+    await session.delete(comment)
+
+    await session.exec(counter_delta(comment.video_id, comments=-1))
+
+    await session.commit()
+    return True
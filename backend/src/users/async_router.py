@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, UploadFile, File, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db import get_async_session
+from src.auth.utils import get_current_user_async
+from src.auth.models import User
+from src.users.schemas import UserPublicSchema, UserUpdateSchema
+from src.users.services import (
+    update_user_async,
+    upload_profile_picture_async,
+    follow_user_async,
+    unfollow_user_async,
+    get_followers_async,
+    get_following_async,
+)
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get("/me", response_model=UserPublicSchema)
+async def me(current_user: User = Depends(get_current_user_async)):
+    return current_user
+
+
+@router.patch("/me", response_model=UserPublicSchema)
+async def update_me(
+    data: UserUpdateSchema,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await update_user_async(user=current_user, data=data, session=session)
+
+
+@router.post("/me/profile-pic", response_model=UserPublicSchema)
+async def update_profile_pic(
+    file: UploadFile = File(...),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await upload_profile_picture_async(
+        user=current_user,
+        file=file,
+        session=session,
+    )
+
+
+@router.post("/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+async def follow(
+    user_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async),
+):
+    await follow_user_async(
+        target_user_id=user_id,
+        current_user=current_user,
+        session=session,
+    )
+
+
+@router.delete("/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+async def unfollow(
+    user_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async),
+):
+    await unfollow_user_async(
+        target_user_id=user_id,
+        current_user=current_user,
+        session=session,
+    )
+
+
+@router.get("/{user_id}/followers", response_model=list[UserPublicSchema])
+async def followers(
+    user_id: int,
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await get_followers_async(user_id=user_id, session=session)
+
+
+@router.get("/{user_id}/following", response_model=list[UserPublicSchema])
+async def following(
+    user_id: int,
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await get_following_async(user_id=user_id, session=session)
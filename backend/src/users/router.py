@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, UploadFile, File, status
 from sqlmodel import Session
 
-from src.db import get_session
+from src.db import get_read_session, get_session
 from src.auth.utils import get_current_user
 from src.auth.models import User
 from src.users.schemas import UserPublicSchema, UserUpdateSchema
@@ -72,7 +72,7 @@ def unfollow(
 @router.get("/{user_id}/followers", response_model=list[UserPublicSchema])
 def followers(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
 ):
     return get_followers(user_id=user_id, session=session)
 
@@ -80,7 +80,7 @@ def followers(
 @router.get("/{user_id}/following", response_model=list[UserPublicSchema])
 def following(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
 ):
     return get_following(user_id=user_id, session=session)
 
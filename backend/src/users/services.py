@@ -1,16 +1,20 @@
+import asyncio
 import os
 import shutil
 import tempfile
 from uuid import uuid4
 
 from fastapi import UploadFile, HTTPException
-from google.cloud import storage
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.auth.models import User
 from src.users.models import Follow
 from src.config import get_settings
+from src.gcp.clients import get_storage_client
 from src.gcp.storage import signed_get_url
+from src.feed.timeline import backfill_follow, remove_follow
+from src.auth.cache import invalidate_user
 
 settings = get_settings()
 BUCKET_NAME = settings.GCS_BUCKET_NAME
@@ -29,26 +33,21 @@ def update_user(
 
     session.add(user)
     session.commit()
+    invalidate_user(user.id)
     session.refresh(user)
     return user
 
 
-def upload_profile_picture(
-    *,
-    user: User,
-    file: UploadFile,
-    session: Session,
-) -> User:
+def _store_profile_picture(user_id: int, file: UploadFile) -> str:
     suffix = os.path.splitext(file.filename or "")[1] or ".jpg"
-    blob_name = f"profile_pics/{user.id}/{uuid4().hex}{suffix}"
+    blob_name = f"profile_pics/{user_id}/{uuid4().hex}{suffix}"
 
     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
         shutil.copyfileobj(file.file, tmp)
         tmp_path = tmp.name
 
     try:
-        client = storage.Client()
-        bucket = client.bucket(BUCKET_NAME)
+        bucket = get_storage_client().bucket(BUCKET_NAME)
         blob = bucket.blob(blob_name)
 
         blob.upload_from_filename(
@@ -56,16 +55,24 @@ def upload_profile_picture(
             content_type=file.content_type,
         )
 
-        url = signed_get_url(BUCKET_NAME, blob_name)
+        return signed_get_url(BUCKET_NAME, blob_name)
     finally:
         try:
             os.remove(tmp_path)
         except OSError:
             pass
 
-    user.profile_pic = url
+
+def upload_profile_picture(
+    *,
+    user: User,
+    file: UploadFile,
+    session: Session,
+) -> User:
+    user.profile_pic = _store_profile_picture(user.id, file)
     session.add(user)
     session.commit()
+    invalidate_user(user.id)
     session.refresh(user)
     return user
 
@@ -98,6 +105,7 @@ def follow_user(
             followed_id=target_user_id,
         )
     )
+    backfill_follow(session, current_user.id, target_user_id)
     session.commit()
 
 
@@ -120,6 +128,7 @@ def unfollow_user(
         raise HTTPException(status_code=400, detail="Not following this user")
 
     session.delete(relation)
+    remove_follow(session, current_user.id, target_user_id)
     session.commit()
 
 
@@ -139,3 +148,109 @@ def get_following(user_id: int, session: Session):
         .where(Follow.follower_id == user_id)
     )
     return session.exec(stmt).all()
+
+
+async def update_user_async(
+    *,
+    user: User,
+    data,
+    session: AsyncSession,
+) -> User:
+    if data.username is not None:
+        user.username = data.username
+
+    if data.bio is not None:
+        user.bio = data.bio
+
+    session.add(user)
+    await session.commit()
+    invalidate_user(user.id)
+    await session.refresh(user)
+    return user
+
+
+async def upload_profile_picture_async(
+    *,
+    user: User,
+    file: UploadFile,
+    session: AsyncSession,
+) -> User:
+    user.profile_pic = await asyncio.to_thread(_store_profile_picture, user.id, file)
+    session.add(user)
+    await session.commit()
+    invalidate_user(user.id)
+    await session.refresh(user)
+    return user
+
+
+async def follow_user_async(
+    *,
+    target_user_id: int,
+    current_user: User,
+    session: AsyncSession,
+):
+    if target_user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot follow yourself")
+
+    target = await session.get(User, target_user_id)
+    if not target:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    stmt = select(Follow).where(
+        Follow.follower_id == current_user.id,
+        Follow.followed_id == target_user_id,
+    )
+    exists = (await session.exec(stmt)).first()
+
+    if exists:
+        raise HTTPException(status_code=400, detail="Already following this user")
+
+    session.add(
+        Follow(
+            follower_id=current_user.id,
+            followed_id=target_user_id,
+        )
+    )
+    await session.run_sync(backfill_follow, current_user.id, target_user_id)
+    await session.commit()
+
+
+async def unfollow_user_async(
+    *,
+    target_user_id: int,
+    current_user: User,
+    session: AsyncSession,
+):
+    if target_user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot unfollow yourself")
+
+    stmt = select(Follow).where(
+        Follow.follower_id == current_user.id,
+        Follow.followed_id == target_user_id,
+    )
+    relation = (await session.exec(stmt)).first()
+
+    if not relation:
+        raise HTTPException(status_code=400, detail="Not following this user")
+
+    await session.delete(relation)
+    await session.run_sync(remove_follow, current_user.id, target_user_id)
+    await session.commit()
+
+
+async def get_followers_async(user_id: int, session: AsyncSession):
+    stmt = (
+        select(User)
+        .join(Follow, Follow.follower_id == User.id)
+        .where(Follow.followed_id == user_id)
+    )
+    return (await session.exec(stmt)).all()
+
+
+async def get_following_async(user_id: int, session: AsyncSession):
+    stmt = (
+        select(User)
+        .join(Follow, Follow.followed_id == User.id)
+        .where(Follow.follower_id == user_id)
+    )
+    return (await session.exec(stmt)).all()
@@ -0,0 +1,77 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.utils import get_current_user_async
+from src.db import get_async_session
+from src.events.outbox import relay as outbox_relay
+from src.gcp.publisher import enqueue_generation_job
+from src.videos.enums import GenerationStatus
+from src.videos.generation.quota import check_generation_quota, reserve_generation
+from src.videos.generation.references import (
+    record_reference_images,
+    store_reference_images,
+    validate_reference_images,
+)
+from src.videos.generation.schema import (
+    VideoGenerationJob as VideoGenerationJobSchema,
+    VideoGenerationResponse,
+)
+from src.videos.models import VideoGenerationJob as VideoGenerationJobModel
+from src.events.broker import notify_job_status
+
+
+router = APIRouter(prefix="/video-generation", tags=["video-generation"])
+
+
+@router.post("/generate", response_model=VideoGenerationResponse)
+async def generate(
+    prompt: str = Form(...),
+    reference_images: list[UploadFile] = File(default=[]),
+    session: AsyncSession = Depends(get_async_session),
+    current_user=Depends(get_current_user_async),
+):
+    prompt = prompt.strip()
+    if not prompt:
+        raise HTTPException(status_code=400, detail="Prompt is required.")
+
+    validate_reference_images(reference_images)
+    check_generation_quota(current_user)
+
+    reference_image_paths, new_references = await asyncio.to_thread(
+        store_reference_images, reference_images
+    )
+
+    # the quota increment, image records, job insert, notification and
+    # dispatch message commit together
+    await session.run_sync(reserve_generation, current_user)
+    await session.run_sync(record_reference_images, new_references)
+    job = VideoGenerationJobModel(
+        user_id=current_user.id,
+        prompt=prompt,
+        reference_image_paths=reference_image_paths,
+        status=GenerationStatus.QUEUED,
+    )
+    session.add(job)
+    await session.flush()
+    await session.run_sync(notify_job_status, job)
+    await session.run_sync(enqueue_generation_job, job.id, prompt)
+    await session.commit()
+    outbox_relay.wake()
+
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get("/{job_id}", response_model=VideoGenerationJobSchema)
+async def get_generation_status(
+    job_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user=Depends(get_current_user_async),
+):
+    job = await session.get(VideoGenerationJobModel, job_id)
+
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
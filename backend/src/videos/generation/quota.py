@@ -0,0 +1,109 @@
+"""Daily video generation quota.
+
+``reserve_generation`` bumps the caller's row in ``generation_quota_usage``
+with a conditional upsert in the request's transaction, so the job insert and
+the quota increment commit (or roll back) together and concurrent submits
+serialize on that one row instead of racing past a count. Users found over
+their limit are remembered in-process for a few minutes and rejected without
+touching the database.
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session
+
+from src.auth.models import User
+from src.config import get_settings
+from src.metrics import counter
+from src.videos.models import GenerationQuotaUsage
+
+rejected_cached = counter("generation_quota_rejections_cached")
+rejected = counter("generation_quota_rejections")
+
+DEFAULT_TIER = "free"
+
+
+def daily_limit(user: User) -> int:
+    limits = get_settings().GENERATION_TIER_LIMITS
+    return limits.get(user.tier or DEFAULT_TIER, limits.get(DEFAULT_TIER, 0))
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _end_of_day(day: date) -> float:
+    """``day``'s UTC midnight as a ``time.time()`` value."""
+    midnight = datetime.combine(day + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+    return midnight.timestamp()
+
+
+class _OverQuotaCache:
+    def __init__(self):
+        self._until: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def is_over(self, user_id: int) -> bool:
+        until = self._until.get(user_id)
+        if until is None:
+            return False
+        if until <= time.time():
+            with self._lock:
+                self._until.pop(user_id, None)
+            return False
+        return True
+
+    def mark(self, user_id: int, day: date, ttl_seconds: float) -> None:
+        # never past midnight, when the quota resets
+        until = min(time.time() + ttl_seconds, _end_of_day(day))
+        with self._lock:
+            self._until[user_id] = until
+
+
+_over_quota = _OverQuotaCache()
+
+
+def _limit_reached(limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=f"Daily generation limit reached ({limit} per day).",
+    )
+
+
+def check_generation_quota(user: User) -> None:
+    """Cheap pre-check: rejects users already known to be over quota."""
+    if _over_quota.is_over(user.id):
+        rejected_cached.inc()
+        raise _limit_reached(daily_limit(user))
+
+
+def _reserve_stmt(user_id: int, day: date, limit: int):
+    stmt = pg_insert(GenerationQuotaUsage).values(user_id=user_id, day=day, used=1)
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id", "day"],
+        set_={"used": GenerationQuotaUsage.used + 1},
+        where=GenerationQuotaUsage.used < limit,
+    ).returning(GenerationQuotaUsage.used)
+
+
+def reserve_generation(session: Session, user: User) -> date:
+    """Takes one of today's generations for ``user`` in the current
+    transaction, or raises 429. Returns the quota day."""
+    check_generation_quota(user)
+
+    limit = daily_limit(user)
+    day = _today()
+    used: Optional[int] = None
+    if limit > 0:
+        used = session.exec(_reserve_stmt(user.id, day, limit)).first()
+    if used is None:
+        # nothing inserted or updated: the row is already at the limit
+        rejected.inc()
+        _over_quota.mark(user.id, day, get_settings().GENERATION_QUOTA_REJECTION_CACHE_SECONDS)
+        raise _limit_reached(limit)
+    return day
+
@@ -0,0 +1,188 @@
+"""Validation and storage of the reference images sent with a generation.
+
+Images are stored once per content under ``references/sha256/<digest>``,
+tracked in ``reference_images``. An image stored recently enough to outlive
+the job is not uploaded again; the others upload concurrently on a small
+shared executor before the job row exists, so the job is inserted once with
+its final paths and submit latency is at most that of the slowest upload.
+"""
+import hashlib
+import mimetypes
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+
+from src.config import get_settings
+from src.datetime_utils import utcnow
+from src.db import engine
+from src.gcp.storage import upload_upload_file_to_bucket
+from src.metrics import counter
+from src.videos.models import ReferenceImage
+
+reused = counter("reference_images_reused")
+uploaded = counter("reference_images_uploaded")
+
+MAX_REFERENCE_IMAGES = 3
+MAX_REFERENCE_IMAGE_SIZE_BYTES = 10 * 1024 * 1024
+ALLOWED_REFERENCE_MIME_TYPES = {
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+}
+HASH_CHUNK_BYTES = 1024 * 1024
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_settings().REFERENCE_UPLOAD_MAX_WORKERS,
+                    thread_name_prefix="reference-upload",
+                )
+    return _executor
+
+
+def validate_reference_images(reference_images: list[UploadFile]) -> None:
+    if len(reference_images) > MAX_REFERENCE_IMAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"You can upload up to {MAX_REFERENCE_IMAGES} reference images.",
+        )
+
+    for image in reference_images:
+        if image.content_type not in ALLOWED_REFERENCE_MIME_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail="Only JPEG, PNG, and WEBP reference images are supported.",
+            )
+
+        image.file.seek(0, 2)
+        size = image.file.tell()
+        image.file.seek(0)
+        if size > MAX_REFERENCE_IMAGE_SIZE_BYTES:
+            raise HTTPException(
+                status_code=400,
+                detail="Each reference image must be 10MB or smaller.",
+            )
+
+
+def _digest(image: UploadFile) -> tuple[str, int]:
+    sha256 = hashlib.sha256()
+    size = 0
+    image.file.seek(0)
+    while chunk := image.file.read(HASH_CHUNK_BYTES):
+        sha256.update(chunk)
+        size += len(chunk)
+    image.file.seek(0)
+    return sha256.hexdigest(), size
+
+
+def _object_path(sha256: str, content_type: str) -> str:
+    ext = mimetypes.guess_extension(content_type or "") or ".jpg"
+    return f"references/sha256/{sha256}{ext}"
+
+
+def _reusable_paths(digests: Iterable[str]) -> dict[str, str]:
+    """Object paths of images uploaded recently enough that the lifecycle
+    rule will not delete them before the job runs."""
+    cutoff = utcnow() - timedelta(seconds=get_settings().REFERENCE_IMAGE_REUSE_SECONDS)
+    # own short session: the request's transaction should not stay open
+    # across the uploads that follow
+    with Session(engine) as session:
+        rows = session.exec(
+            select(ReferenceImage.sha256, ReferenceImage.object_path).where(
+                ReferenceImage.sha256.in_(list(digests)),
+                ReferenceImage.uploaded_at >= cutoff,
+            )
+        ).all()
+    return dict(rows)
+
+
+def _upload(bucket_name: str, blob_name: str, image: UploadFile) -> str:
+    return upload_upload_file_to_bucket(
+        bucket_name=bucket_name,
+        destination_blob_name=blob_name,
+        file=image,
+    )
+
+
+def store_reference_images(reference_images: list[UploadFile]) -> tuple[list[str], list[ReferenceImage]]:
+    """Returns the object path of each image in request order, plus the
+    ``reference_images`` rows for the ones uploaded now; write those with
+    ``record_reference_images`` in the job's transaction.
+
+    Nothing is deleted when an upload fails: the objects are
+    content-addressed, may already back another request's job, and the
+    lifecycle rule removes any that end up unreferenced.
+    """
+    if not reference_images:
+        return [], []
+
+    digests = [_digest(image) for image in reference_images]
+    paths = _reusable_paths({sha256 for sha256, _ in digests})
+
+    pending: dict[str, tuple[UploadFile, int]] = {}
+    for image, (sha256, size) in zip(reference_images, digests):
+        if sha256 not in paths and sha256 not in pending:
+            pending[sha256] = (image, size)
+    reused.inc(len(reference_images) - len(pending))
+
+    bucket_name = get_settings().GCS_BUCKET_NAME
+    uploaded_at = utcnow()
+    futures: dict[str, Future] = {
+        sha256: _get_executor().submit(_upload, bucket_name, _object_path(sha256, image.content_type), image)
+        for sha256, (image, _) in pending.items()
+    }
+    wait(futures.values())
+    for future in futures.values():
+        if future.exception() is not None:
+            raise future.exception()
+    uploaded.inc(len(futures))
+
+    rows = []
+    for sha256, future in futures.items():
+        image, size = pending[sha256]
+        paths[sha256] = future.result()
+        rows.append(ReferenceImage(
+            sha256=sha256,
+            object_path=paths[sha256],
+            size_bytes=size,
+            content_type=image.content_type,
+            uploaded_at=uploaded_at,
+        ))
+    return [paths[sha256] for sha256, _ in digests], rows
+
+
+def record_reference_images(session: Session, rows: list[ReferenceImage]) -> None:
+    """Upserts freshly uploaded images, restarting their reuse window."""
+    if not rows:
+        return
+    stmt = pg_insert(ReferenceImage).values([
+        {
+            "sha256": row.sha256,
+            "object_path": row.object_path,
+            "size_bytes": row.size_bytes,
+            "content_type": row.content_type,
+            "uploaded_at": row.uploaded_at,
+        }
+        for row in rows
+    ])
+    session.exec(stmt.on_conflict_do_update(
+        index_elements=["sha256"],
+        set_={
+            "object_path": stmt.excluded.object_path,
+            "size_bytes": stmt.excluded.size_bytes,
+            "content_type": stmt.excluded.content_type,
+            "uploaded_at": stmt.excluded.uploaded_at,
+        },
+    ))
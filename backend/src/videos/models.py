@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 import sqlalchemy as sa
 
@@ -9,6 +9,15 @@ from src.videos.enums import VideoStatus, GenerationStatus
 
 class Video(SQLModel, table=True):
     __tablename__ = "videos"
+    __table_args__ = (
+        # keyset pagination order for the feed
+        sa.Index(
+            "ix_videos_status_created_at_id",
+            "status",
+            sa.text("created_at DESC"),
+            sa.text("id DESC"),
+        ),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
@@ -46,6 +55,14 @@ class Video(SQLModel, table=True):
 
 class VideoGenerationJob(SQLModel, table=True):
     __tablename__ = "video_generation_jobs"
+    __table_args__ = (
+        # the reaper's scan for expired leases
+        sa.Index(
+            "ix_video_generation_jobs_running_lease",
+            "lease_expires_at",
+            postgresql_where=sa.text("status = 'RUNNING'"),
+        ),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
@@ -66,6 +83,16 @@ class VideoGenerationJob(SQLModel, table=True):
     # failure info
     error_message: Optional[str] = None
 
+    # worker claim: the worker that last claimed the job, and until when it
+    # holds it RUNNING (renewed by heartbeats; the reaper requeues expired
+    # leases until ``attempts`` runs out)
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = Field(
+        default=None,
+        sa_type=sa.DateTime(timezone=True),
+    )
+    attempts: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
     # publish info
     published_video_id: Optional[int] = Field(default=None, index=True)
 
@@ -78,9 +105,50 @@ class VideoGenerationJob(SQLModel, table=True):
     )
     updated_at: datetime = Field(
         default_factory=utcnow,
+        index=True,
         sa_type=sa.DateTime(timezone=True),
         sa_column_kwargs={
             "server_default": sa.func.now(),
             "onupdate": sa.func.now(),
         },
     )
+
+
+class GenerationQuotaUsage(SQLModel, table=True):
+    """Generations started per user per UTC day, bumped in the same
+    transaction as the job insert."""
+
+    __tablename__ = "generation_quota_usage"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    used: int = Field(default=0)
+
+
+class ReferenceImage(SQLModel, table=True):
+    """A reference image stored once under ``references/sha256/``, keyed by
+    the SHA-256 of its bytes."""
+
+    __tablename__ = "reference_images"
+
+    sha256: str = Field(primary_key=True, max_length=64)
+    object_path: str
+    size_bytes: int
+    content_type: str
+
+    created_at: datetime = Field(
+        default_factory=utcnow,
+        sa_type=sa.DateTime(timezone=True),
+        sa_column_kwargs={
+            "server_default": sa.func.now(),
+        },
+    )
+    # when the object was last written; the bucket's lifecycle rule deletes
+    # references/ objects two days after that
+    uploaded_at: datetime = Field(
+        default_factory=utcnow,
+        sa_type=sa.DateTime(timezone=True),
+        sa_column_kwargs={
+            "server_default": sa.func.now(),
+        },
+    )
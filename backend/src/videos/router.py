@@ -2,34 +2,21 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional
 from sqlmodel import Session
 
-from src.db import get_session
+from src.db import get_read_session, get_session
 from src.videos.models import Video, VideoGenerationJob
 from src.videos.schema import VideosResponse, VideoPublic
 from src.auth.utils import get_current_user
 from src.auth.models import User
 from src.videos.service import list_user_videos
 from src.videos.enums import GenerationStatus, VideoStatus
-from src.gcp.storage import signed_get_url
-from src.config import get_settings
+from src.gcp.signing import sign_many
+from src.feed.timeline import fan_out_video
+from src.events.broker import notify_job_status
+from src.user_interactions.counters import current_counts, pending_counts
 
 
 router = APIRouter(prefix="/videos", tags=["videos"])
 
-def _signed_media_url(path: Optional[str], minutes: int = 30) -> Optional[str]:
-    if not path:
-        return None
-    if path.startswith("http://") or path.startswith("https://"):
-        return path
-    if path.startswith("gs://"):
-        trimmed = path[len("gs://"):]
-        bucket, _, object_name = trimmed.partition("/")
-        if bucket and object_name:
-            return signed_get_url(bucket, object_name, minutes=minutes)
-    settings = get_settings()
-    object_name = path.lstrip("/")
-    if settings.GCS_BUCKET_NAME and object_name:
-        return signed_get_url(settings.GCS_BUCKET_NAME, object_name, minutes=minutes)
-    return path
 
 @router.post("/{job_id}/publish")
 def publish_generation(
@@ -60,6 +47,8 @@ def publish_generation(
     session.flush()
     job.published_video_id = video.id
     session.add(job)
+    fan_out_video(session, video)
+    notify_job_status(session, job)
     session.commit()
     session.refresh(video)
 
@@ -77,23 +66,25 @@ def get_user_videos(
 @router.get("/{video_id}", response_model=VideoPublic)
 def get_video(
     video_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
 ):
     video = session.get(Video, video_id)
     if not video or video.status != VideoStatus.READY:
         raise HTTPException(status_code=404, detail="Video not found")
 
     source_path = video.processed_path or video.source_path
+    urls = sign_many([source_path, video.thumbnail_path])
+    likes_count, comments_count = current_counts(video, pending_counts(session, [video.id]))
 
     return VideoPublic(
         id=video.id,
         owner_id=video.user_id,
         caption=video.caption,
         status=video.status,
-        video_url=_signed_media_url(source_path),
-        thumbnail_url=_signed_media_url(video.thumbnail_path),
-        likes_count=video.likes_count,
-        comments_count=video.comments_count,
+        video_url=urls.get(source_path),
+        thumbnail_url=urls.get(video.thumbnail_path),
+        likes_count=likes_count,
+        comments_count=comments_count,
         created_at=video.created_at,
         updated_at=video.updated_at,
     )
@@ -115,7 +106,9 @@ def get_preview_urls(
     if not job.preview_video_path:
         raise HTTPException(status_code=500, detail="Preview object missing")
 
+    urls = sign_many([job.preview_video_path, job.preview_thumbnail_path], minutes=30)
+
     return {
-        "preview_video_url": _signed_media_url(job.preview_video_path, minutes=30),
-        "preview_thumbnail_url": _signed_media_url(job.preview_thumbnail_path, minutes=30),
+        "preview_video_url": urls.get(job.preview_video_path),
+        "preview_thumbnail_url": urls.get(job.preview_thumbnail_path),
     }
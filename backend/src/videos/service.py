@@ -5,29 +5,12 @@ from src.videos.models import Video, VideoGenerationJob
 from src.videos.schema import GenerationCreate, VideoCreate, VideoPublic, VideosResponse
 from src.videos.enums import GenerationStatus
 from src.auth.models import User
-from src.gcp.publisher import publish_generation_job
-from src.gcp.storage import signed_get_url
-from src.config import get_settings
+from src.events.outbox import relay as outbox_relay
+from src.gcp.publisher import enqueue_generation_job
+from src.gcp.signing import sign_many
+from src.user_interactions.counters import current_counts, pending_counts
 
 
-def _signed_media_url(path: Optional[str], minutes: int = 30) -> Optional[str]:
-    if not path:
-        return None
-    if path.startswith("http://") or path.startswith("https://"):
-        return path
-    if path.startswith("gs://"):
-        trimmed = path[len("gs://"):]
-        bucket, _, object_name = trimmed.partition("/")
-        if bucket and object_name:
-            return signed_get_url(bucket, object_name, minutes=minutes)
-    settings = get_settings()
-    object_name = path.lstrip("/")
-    if settings.GCS_BUCKET_NAME and object_name:
-        path = signed_get_url(settings.GCS_BUCKET_NAME, object_name, minutes=minutes)
-        print(f"Generated signed URL for {path}: {path}")
-        return path
-    return path
-
 def create_video(data: VideoCreate, user: User, session: Session) -> Video:
     video = Video(
         caption=data.caption,
@@ -44,6 +27,8 @@ def list_user_videos(user: User, session: Session) -> list[Video]:
     videos = session.exec(
         select(Video).where(Video.user_id == user.id)
     ).all()
+    urls = sign_many(path for v in videos for path in (v.source_path, v.thumbnail_path))
+    pending = pending_counts(session, (v.id for v in videos))
 
     # convert to VideoObject schema
     videos = [
@@ -52,14 +37,15 @@ def list_user_videos(user: User, session: Session) -> list[Video]:
             owner_id=v.user_id,
             caption=v.caption,
             status=v.status,
-            video_url=_signed_media_url(v.source_path),
-            thumbnail_url=_signed_media_url(v.thumbnail_path),
-            likes_count=v.likes_count,
-            comments_count=v.comments_count,
+            video_url=urls.get(v.source_path),
+            thumbnail_url=urls.get(v.thumbnail_path),
+            likes_count=likes_count,
+            comments_count=comments_count,
             created_at=v.created_at,
             updated_at=v.updated_at,
         )
         for v in videos
+        for likes_count, comments_count in [current_counts(v, pending)]
     ]
     return VideosResponse(videos=videos)
 
@@ -77,9 +63,10 @@ def create_generation_task(
     )
 
     session.add(job)
+    session.flush()
+    enqueue_generation_job(session, job.id, job.prompt)
     session.commit()
     session.refresh(job)
-
-    publish_generation_job(job.id)
+    outbox_relay.wake()
 
     return job
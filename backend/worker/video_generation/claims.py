@@ -0,0 +1,383 @@
+"""Leased claims on generation jobs.
+
+A worker runs a job only after ``claim_job`` atomically moves it from QUEUED
+to RUNNING under its ``WORKER_ID`` with a lease, so a redelivered or
+duplicated dispatch message finds the job already claimed and does nothing.
+While the job runs, a ``LeaseKeeper`` renews the lease; outcome writes only
+land while the worker still owns the job. When a worker dies its lease
+expires and ``requeue_expired`` puts the job back to QUEUED with a fresh
+dispatch message in ``outbox_messages`` (the API's outbox relay publishes
+it), or fails it once it has used up ``MAX_JOB_ATTEMPTS``. A job still
+QUEUED ``JOB_DISPATCH_TIMEOUT_SECONDS`` after its last dispatch (the worker
+never started, or died before claiming) is dispatched again the same way.
+
+Run the reaper once, e.g. from Cloud Scheduler alongside per-job workers::
+
+    python claims.py --reap
+"""
+import os
+import socket
+import logging
+import argparse
+import threading
+from abc import ABC, abstractmethod
+
+import psycopg2
+
+DATABASE_URL = os.environ["DATABASE_URL"]
+
+WORKER_ID = os.environ.get("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+# a claim not renewed for this long is considered lost; renewed every third of it
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "300"))
+# claims per job, including the first; an expired lease past this fails the job
+MAX_JOB_ATTEMPTS = int(os.environ.get("MAX_JOB_ATTEMPTS", "3"))
+# a QUEUED job with no pending dispatch message is dispatched again after this
+JOB_DISPATCH_TIMEOUT_SECONDS = int(os.environ.get("JOB_DISPATCH_TIMEOUT_SECONDS", "900"))
+REAPER_INTERVAL_SECONDS = float(os.environ.get("REAPER_INTERVAL_SECONDS", "60"))
+REAPER_BATCH_SIZE = int(os.environ.get("REAPER_BATCH_SIZE", "100"))
+# Must match GCP_PUBSUB_VIDEO_GEN_TOPIC in the API; requeued jobs are
+# dispatched on it again.
+GENERATION_TOPIC = os.environ.get("GCP_PUBSUB_VIDEO_GEN_TOPIC", "")
+
+# Must match src.events.broker.JOB_STATUS_CHANNEL in the API.
+JOB_STATUS_CHANNEL = "video_generation_job_status"
+
+NOTIFY_UPDATED = f"""
+    SELECT pg_notify(
+        '{JOB_STATUS_CHANNEL}',
+        json_build_object('id', id, 'user_id', user_id)::text
+    )
+    FROM updated
+"""
+
+
+# ---------------------------
+# Claims
+# ---------------------------
+
+def claim_job(conn, job_id: int, worker_id: str = WORKER_ID, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+    """Moves the job from QUEUED to RUNNING for ``worker_id``; returns False
+    when it is not QUEUED (already claimed, finished or missing)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            WITH updated AS (
+                UPDATE video_generation_jobs
+                SET status='RUNNING',
+                    worker_id=%s,
+                    lease_expires_at=NOW() + make_interval(secs => %s),
+                    attempts=attempts + 1,
+                    updated_at=NOW()
+                WHERE id=%s
+                  AND status='QUEUED'
+                RETURNING id, user_id
+            )
+            """ + NOTIFY_UPDATED,
+            (worker_id, lease_seconds, job_id),
+        )
+        claimed = cur.rowcount == 1
+    conn.commit()
+    return claimed
+
+
+def renew_leases(conn, job_ids, worker_id: str = WORKER_ID, lease_seconds: int = JOB_LEASE_SECONDS) -> set[int]:
+    """Extends the leases ``worker_id`` still holds; returns their job ids."""
+    if not job_ids:
+        return set()
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE video_generation_jobs
+            SET lease_expires_at=NOW() + make_interval(secs => %s)
+            WHERE id = ANY(%s)
+              AND worker_id=%s
+              AND status='RUNNING'
+            RETURNING id
+            """,
+            (lease_seconds, list(job_ids), worker_id),
+        )
+        renewed = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return renewed
+
+
+# Shared tail of the reaper statements: ``updated`` holds the released
+# jobs; the QUEUED ones get a dispatch message, all of them a notification.
+REQUEUE_UPDATED = """
+    dispatched AS (
+        INSERT INTO outbox_messages (topic, payload, attempts, available_at, created_at)
+        SELECT %(topic)s, json_build_object('job_id', id, 'prompt', prompt), 0, NOW(), NOW()
+        FROM updated
+        WHERE status='QUEUED'
+        RETURNING id
+    ),
+    notified AS (
+        SELECT pg_notify(
+            '""" + JOB_STATUS_CHANNEL + """',
+            json_build_object('id', id, 'user_id', user_id)::text
+        )
+        FROM updated
+    )
+    SELECT
+        (SELECT count(*) FROM dispatched),
+        (SELECT count(*) FROM updated WHERE status='FAILED'),
+        (SELECT count(*) FROM notified)
+"""
+
+
+def _release(conn, sql: str, params: dict) -> tuple[int, int]:
+    with conn.cursor() as cur:
+        cur.execute(sql + REQUEUE_UPDATED, params)
+        requeued, failed, _ = cur.fetchone()
+    conn.commit()
+    return requeued, failed
+
+
+def requeue_expired(
+    conn,
+    topic: str = GENERATION_TOPIC,
+    max_attempts: int = MAX_JOB_ATTEMPTS,
+    limit: int = REAPER_BATCH_SIZE,
+) -> tuple[int, int]:
+    """Releases up to ``limit`` RUNNING jobs whose lease has expired and
+    returns ``(requeued, failed)``.
+
+    Jobs with attempts left go back to QUEUED and get a dispatch message in
+    the outbox in the same transaction; the rest are marked FAILED. Expired
+    rows are locked with ``SKIP LOCKED``, so any number of reapers can run.
+    """
+    return _release(
+        conn,
+        """
+        WITH expired AS (
+            SELECT id
+            FROM video_generation_jobs
+            WHERE status='RUNNING'
+              AND lease_expires_at < NOW()
+            ORDER BY lease_expires_at
+            LIMIT %(limit)s
+            FOR UPDATE SKIP LOCKED
+        ),
+        updated AS (
+            UPDATE video_generation_jobs j
+            SET status=CASE
+                    WHEN j.attempts >= %(max_attempts)s THEN 'FAILED'::generationstatus
+                    ELSE 'QUEUED'::generationstatus
+                END,
+                error_message=CASE
+                    WHEN j.attempts >= %(max_attempts)s
+                    THEN 'Worker stopped responding after ' || j.attempts || ' attempts'
+                    ELSE j.error_message
+                END,
+                worker_id=NULL,
+                lease_expires_at=NULL,
+                updated_at=NOW()
+            FROM expired
+            WHERE j.id = expired.id
+            RETURNING j.id, j.user_id, j.prompt, j.status
+        ),
+        """,
+        {"topic": topic, "max_attempts": max_attempts, "limit": limit},
+    )
+
+
+def redispatch_stalled(
+    conn,
+    topic: str = GENERATION_TOPIC,
+    max_attempts: int = MAX_JOB_ATTEMPTS,
+    timeout_seconds: int = JOB_DISPATCH_TIMEOUT_SECONDS,
+    limit: int = REAPER_BATCH_SIZE,
+) -> tuple[int, int]:
+    """Dispatches again up to ``limit`` jobs left QUEUED for
+    ``timeout_seconds`` with no message waiting in the outbox; returns
+    ``(requeued, failed)``.
+
+    A dispatch that never led to a claim costs an attempt, like a claim
+    does, so a job that no worker picks up fails after ``max_attempts``.
+    A job whose message is merely slow is dispatched twice at worst, and
+    the second delivery finds it claimed.
+    """
+    return _release(
+        conn,
+        """
+        WITH stalled AS (
+            SELECT id
+            FROM video_generation_jobs j
+            WHERE status='QUEUED'
+              AND updated_at < NOW() - make_interval(secs => %(timeout)s)
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM outbox_messages m
+                  WHERE m.topic = %(topic)s
+                    AND (m.payload->>'job_id')::bigint = j.id
+              )
+            ORDER BY updated_at
+            LIMIT %(limit)s
+            FOR UPDATE SKIP LOCKED
+        ),
+        updated AS (
+            UPDATE video_generation_jobs j
+            SET attempts=j.attempts + 1,
+                status=CASE
+                    WHEN j.attempts + 1 >= %(max_attempts)s THEN 'FAILED'::generationstatus
+                    ELSE 'QUEUED'::generationstatus
+                END,
+                error_message=CASE
+                    WHEN j.attempts + 1 >= %(max_attempts)s
+                    THEN 'No worker picked up the job after ' || (j.attempts + 1) || ' attempts'
+                    ELSE j.error_message
+                END,
+                updated_at=NOW()
+            FROM stalled
+            WHERE j.id = stalled.id
+            RETURNING j.id, j.user_id, j.prompt, j.status
+        ),
+        """,
+        {"topic": topic, "max_attempts": max_attempts, "timeout": timeout_seconds, "limit": limit},
+    )
+
+
+# ---------------------------
+# Background Threads
+# ---------------------------
+
+class _Periodic(ABC):
+    """Calls ``tick(conn)`` every ``interval`` seconds on a daemon thread
+    with its own connection, reconnecting after a failure."""
+
+    name = "periodic"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is None and self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    @abstractmethod
+    def tick(self, conn) -> None:
+        pass
+
+    def _run(self) -> None:
+        conn = None
+        while not self._stop.wait(self.interval):
+            try:
+                if conn is None or conn.closed:
+                    conn = psycopg2.connect(DATABASE_URL)
+                self.tick(conn)
+            except Exception:
+                logging.exception(f"{self.name} failed")
+                if conn is not None:
+                    conn.close()
+                    conn = None
+        if conn is not None:
+            conn.close()
+
+
+class LeaseKeeper(_Periodic):
+    """Renews the leases of the jobs this worker is running.
+
+    ``hold`` a job right after claiming it and ``release`` it once its
+    outcome is recorded. A job whose lease turns out to be lost (it expired
+    and was requeued) is dropped with a warning; its outcome writes no
+    longer apply.
+    """
+
+    name = "lease-keeper"
+
+    def __init__(self, worker_id: str = WORKER_ID, lease_seconds: int = JOB_LEASE_SECONDS):
+        super().__init__(interval=lease_seconds / 3)
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self._held: set[int] = set()
+        self._lock = threading.Lock()
+
+    def hold(self, job_id: int) -> None:
+        with self._lock:
+            self._held.add(job_id)
+
+    def release(self, job_id: int) -> None:
+        with self._lock:
+            self._held.discard(job_id)
+
+    def tick(self, conn) -> None:
+        with self._lock:
+            held = set(self._held)
+        renewed = renew_leases(conn, held, self.worker_id, self.lease_seconds)
+        # jobs released while renewing are not lost, just done
+        with self._lock:
+            lost = (held - renewed) & self._held
+            self._held -= lost
+        for job_id in lost:
+            logging.warning(f"Lost the lease on job {job_id}, another worker may run it")
+
+
+class LeaseReaper(_Periodic):
+    """Requeues jobs whose worker stopped renewing its lease, and dispatches
+    again those that were never claimed."""
+
+    name = "lease-reaper"
+
+    def __init__(self, interval: float = REAPER_INTERVAL_SECONDS, topic: str = GENERATION_TOPIC):
+        super().__init__(interval=interval)
+        self.topic = topic
+
+    def tick(self, conn) -> None:
+        reap(conn, self.topic)
+
+
+def reap(conn, topic: str = GENERATION_TOPIC) -> tuple[int, int]:
+    """Requeues expired leases and stalled dispatches until none is left;
+    returns ``(requeued, failed)``."""
+    if not topic:
+        raise RuntimeError("Missing GCP_PUBSUB_VIDEO_GEN_TOPIC for requeued jobs")
+    total_requeued = total_failed = 0
+    for release, what in (
+        (requeue_expired, "with expired leases"),
+        (redispatch_stalled, "never claimed"),
+    ):
+        while True:
+            requeued, failed = release(conn, topic)
+            if requeued or failed:
+                logging.info(f"Requeued {requeued} and failed {failed} jobs {what}")
+            total_requeued += requeued
+            total_failed += failed
+            if requeued + failed < REAPER_BATCH_SIZE:
+                break
+    return total_requeued, total_failed
+
+
+# ---------------------------
+# Main Entry
+# ---------------------------
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Requeue generation jobs whose lease expired or that were never claimed")
+    parser.add_argument("--reap", action="store_true", help="Requeue expired leases and stalled jobs once and exit")
+    parser.add_argument("--topic", default=GENERATION_TOPIC, help="Topic requeued jobs are dispatched on")
+    args = parser.parse_args()
+
+    if not args.reap:
+        parser.error("nothing to do, pass --reap")
+
+    conn = psycopg2.connect(DATABASE_URL)
+    try:
+        requeued, failed = reap(conn, args.topic)
+    finally:
+        conn.close()
+    print(f"Requeued {requeued} jobs, failed {failed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,47 @@
 import os
 import json
 import time
+import signal
+import asyncio
 import logging
 import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
 from pathlib import Path
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 from google import genai
-from google.genai import types
 from google.cloud import storage
 import argparse
 
+from claims import WORKER_ID, GENERATION_TOPIC, LeaseKeeper, LeaseReaper, claim_job
+from veo_generator import EventLoopThread, FakeVeoClient, GenaiVeoClient, VeoClient, VeoPoller
+
 logging.basicConfig(level=logging.INFO)
 
 DATABASE_URL = os.environ["DATABASE_URL"]
 GCS_BUCKET = os.environ["GCS_BUCKET"]
 GOOGLE_API_KEY = os.environ["GOOGLE_API_KEY"]
 
+# "fake" generates placeholder clips without calling Veo
+VEO_CLIENT = os.environ.get("VEO_CLIENT", "genai")
+VEO_POLL_INITIAL_SECONDS = float(os.environ.get("VEO_POLL_INITIAL_SECONDS", "2"))
+VEO_POLL_MAX_SECONDS = float(os.environ.get("VEO_POLL_MAX_SECONDS", "15"))
+
+# --serve mode only
+PUBSUB_SUBSCRIPTION = os.environ.get("PUBSUB_SUBSCRIPTION", "")
+# generations in flight at once
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", "32"))
+# threads preparing jobs (status update, reference downloads) before handing
+# them to the poller
+WORKER_PREPARE_THREADS = int(os.environ.get("WORKER_PREPARE_THREADS", "4"))
+# Pub/Sub keeps extending a message's ack deadline while its job runs, up to this
+WORKER_MAX_LEASE_SECONDS = int(os.environ.get("WORKER_MAX_LEASE_SECONDS", "3600"))
+
+# Must match src.events.broker.JOB_STATUS_CHANNEL in the API.
+JOB_STATUS_CHANNEL = "video_generation_job_status"
+
 
 # ---------------------------
 # DB Utilities
@@ -25,48 +51,69 @@ def get_conn():
     return psycopg2.connect(DATABASE_URL)
 
 
-def mark_running(conn, job_id):
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            UPDATE video_generation_jobs
-            SET status='RUNNING',
-                updated_at=NOW()
-            WHERE id=%s
-            """,
-            (job_id,),
-        )
-    conn.commit()
+# Each status update NOTIFYs listening API processes in the same statement,
+# so the SSE stream learns about it on commit without polling.
+NOTIFY_UPDATED = f"""
+    SELECT pg_notify(
+        '{JOB_STATUS_CHANNEL}',
+        json_build_object('id', id, 'user_id', user_id)::text
+    )
+    FROM updated
+"""
+
 
+# Outcome writes only apply while this worker still holds the job's claim
+# (see claims.py); after a lost lease they match no row, change nothing and
+# return False.
 
-def mark_success(conn, job_id, preview_path):
+def mark_success(conn, job_id, preview_path) -> bool:
     with conn.cursor() as cur:
         cur.execute(
             """
-            UPDATE video_generation_jobs
-            SET status='SUCCEEDED',
-                preview_video_path=%s,
-                updated_at=NOW()
-            WHERE id=%s
-            """,
-            (preview_path, job_id),
+            WITH updated AS (
+                UPDATE video_generation_jobs
+                SET status='SUCCEEDED',
+                    preview_video_path=%s,
+                    lease_expires_at=NULL,
+                    updated_at=NOW()
+                WHERE id=%s
+                  AND status='RUNNING'
+                  AND worker_id=%s
+                RETURNING id, user_id
+            )
+            """ + NOTIFY_UPDATED,
+            (preview_path, job_id, WORKER_ID),
         )
+        recorded = cur.rowcount == 1
     conn.commit()
+    if not recorded:
+        logging.warning(f"Job {job_id} is no longer claimed by {WORKER_ID}, success not recorded")
+    return recorded
 
 
-def mark_failed(conn, job_id, error_message):
+def mark_failed(conn, job_id, error_message) -> bool:
     with conn.cursor() as cur:
         cur.execute(
             """
-            UPDATE video_generation_jobs
-            SET status='FAILED',
-                error_message=%s,
-                updated_at=NOW()
-            WHERE id=%s
-            """,
-            (error_message[:500], job_id),
+            WITH updated AS (
+                UPDATE video_generation_jobs
+                SET status='FAILED',
+                    error_message=%s,
+                    lease_expires_at=NULL,
+                    updated_at=NOW()
+                WHERE id=%s
+                  AND status='RUNNING'
+                  AND worker_id=%s
+                RETURNING id, user_id
+            )
+            """ + NOTIFY_UPDATED,
+            (error_message[:500], job_id, WORKER_ID),
         )
+        recorded = cur.rowcount == 1
     conn.commit()
+    if not recorded:
+        logging.warning(f"Job {job_id} is no longer claimed by {WORKER_ID}, failure not recorded")
+    return recorded
 
 
 def fetch_job_input(conn, job_id: int) -> tuple[str, list[str]]:
@@ -94,71 +141,48 @@ def fetch_job_input(conn, job_id: int) -> tuple[str, list[str]]:
 
 
 # ---------------------------
-# Veo Generation
+# Clients
 # ---------------------------
 
-def _build_reference_images(reference_local_files: list[str] | None):
-    if not reference_local_files:
-        return None
-
-    references = []
-    for local_path in reference_local_files:
-        image = types.Image.from_file(location=local_path)
-        references.append(
-            types.VideoGenerationReferenceImage(
-                image=image,
-                reference_type=types.VideoGenerationReferenceType.ASSET,
-            )
-        )
-    return references
+# Created once per process, so a --serve worker reuses their connections
+# for every job.
 
+@lru_cache
+def get_genai_client():
+    return genai.Client(api_key=GOOGLE_API_KEY)
 
-def generate_with_veo(
-    prompt: str,
-    duration_seconds: int = 4,
-    reference_local_files: list[str] | None = None,
-) -> str:
-    logging.info("Starting Veo generation")
 
-    normalized_prompt = (prompt or "").strip()
-    if not normalized_prompt:
-        raise RuntimeError("Prompt is empty after trimming whitespace")
-
-    client = genai.Client(api_key=GOOGLE_API_KEY)
-
-    config_kwargs = {
-        "aspect_ratio": "9:16",  # mobile vertical
-        # "resolution": "720p",
-        # "duration_seconds": duration_seconds,
-        # "person_generation": "allow_all",
-    }
-    reference_images = _build_reference_images(reference_local_files)
-    if reference_images:
-        config_kwargs["reference_images"] = reference_images
-
-    operation = client.models.generate_videos(
-        model="veo-3.1-generate-preview",
-        prompt=normalized_prompt,
-        config=types.GenerateVideosConfig(**config_kwargs),
-    )
+@lru_cache
+def get_storage_client():
+    return storage.Client()
 
-    while not operation.done:
-        logging.info("Waiting for Veo...")
-        time.sleep(8)
-        operation = client.operations.get(operation)
 
-    if operation.error:
-        raise RuntimeError(f"Veo failed: {operation.error}")
+@lru_cache
+def get_veo_client() -> VeoClient:
+    if VEO_CLIENT == "fake":
+        return FakeVeoClient()
+    return GenaiVeoClient(get_genai_client())
 
-    if not operation.response or not operation.response.generated_videos:
-        raise RuntimeError("Veo returned empty response")
 
-    generated_video = operation.response.generated_videos[0]
+def get_veo_poller() -> VeoPoller:
+    return VeoPoller(
+        get_veo_client(),
+        initial_interval=VEO_POLL_INITIAL_SECONDS,
+        max_interval=VEO_POLL_MAX_SECONDS,
+    )
 
-    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
-        client.files.download(file=generated_video.video)
-        generated_video.video.save(tmp.name)
-        return tmp.name
+
+# ---------------------------
+# Veo Generation
+# ---------------------------
+
+def generate_with_veo(
+    prompt: str,
+    duration_seconds: int = 4,
+    reference_local_files: list[str] | None = None,
+) -> str:
+    logging.info("Starting Veo generation")
+    return asyncio.run(get_veo_poller().generate(prompt, reference_local_files))
 
 
 # ---------------------------
@@ -166,8 +190,7 @@ def generate_with_veo(
 # ---------------------------
 
 def upload_to_gcs(job_id: int, local_path: str) -> str:
-    client = storage.Client()
-    bucket = client.bucket(GCS_BUCKET)
+    bucket = get_storage_client().bucket(GCS_BUCKET)
 
     object_name = f"previews/{job_id}/preview_{int(time.time())}.mp4"
 
@@ -183,8 +206,7 @@ def download_reference_images(reference_image_paths: list[str]) -> list[str]:
     if not reference_image_paths:
         return []
 
-    client = storage.Client()
-    bucket = client.bucket(GCS_BUCKET)
+    bucket = get_storage_client().bucket(GCS_BUCKET)
     local_paths: list[str] = []
 
     for object_name in reference_image_paths:
@@ -210,43 +232,61 @@ def download_reference_images(reference_image_paths: list[str]) -> list[str]:
 
 
 # ---------------------------
-# Main Entry
+# Job Processing
 # ---------------------------
 
-def main():
-    # 1. Setup the parser
-    parser = argparse.ArgumentParser(description="Cloud Run Job Worker")
+def claim(conn, leases: LeaseKeeper, job_id: int) -> bool:
+    """Claims the job and holds its lease in ``leases``; returns False when
+    it is not QUEUED (a duplicate delivery, or already done).
 
-    # 2. Define your expected arguments
-    # argparse handles the "--key=value" or "--key value" format automatically
-    parser.add_argument("--job_id", type=int, help="The ID of the job")
-    parser.add_argument("--prompt", type=str, help="The text prompt for generation")
+    Errors propagate: the job may still be QUEUED, so the caller must leave
+    it for redelivery rather than record a failure. Once claimed, release
+    the job after recording its outcome.
+    """
+    if not claim_job(conn, job_id):
+        logging.info(f"Job {job_id} is already claimed or finished, skipping")
+        return False
 
-    # 3. Parse the arguments from sys.argv
-    args, unknown = parser.parse_known_args()
+    logging.info(f"Processing job {job_id} as {WORKER_ID}")
+    leases.hold(job_id)
+    return True
 
-    logging.info(f"Received job_id: {args.job_id}")
-    logging.info(f"Received prompt: {args.prompt}")
 
-    job_id = args.job_id
-    if not job_id:
-        raise RuntimeError("Missing required --job_id")
+def prepare_job(conn, job_id: int, prompt_override: str | None = None) -> tuple[str, list[str]]:
+    """Returns the claimed job's prompt and local reference files."""
+    prompt_from_db, reference_image_paths = fetch_job_input(conn, job_id)
+    prompt = (prompt_override or prompt_from_db or "").strip()
+    if not prompt:
+        raise RuntimeError("Prompt is missing for job")
 
-    conn = get_conn()
-    local_reference_files: list[str] = []
-    local_clip: str | None = None
+    return prompt, download_reference_images(reference_image_paths)
 
-    try:
-        logging.info(f"Processing job {job_id}")
 
-        mark_running(conn, job_id)
+def _remove_files(paths: list[str | None]) -> None:
+    for path in paths:
+        if not path:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
 
-        prompt_from_db, reference_image_paths = fetch_job_input(conn, job_id)
-        prompt = (args.prompt or prompt_from_db or "").strip()
-        if not prompt:
-            raise RuntimeError("Prompt is missing for job")
+def run_job(conn, leases: LeaseKeeper, job_id: int, prompt_override: str | None = None) -> None:
+    """Claims ``job_id``, generates its preview and records the outcome.
 
-        local_reference_files = download_reference_images(reference_image_paths)
+    Does nothing when the job is already claimed. A failed generation is
+    recorded as FAILED and returns normally; this only raises when the job
+    could not be claimed or its outcome could not be written.
+    """
+    local_reference_files: list[str] = []
+    local_clip: str | None = None
+
+    if not claim(conn, leases, job_id):
+        return
+
+    try:
+        prompt, local_reference_files = prepare_job(conn, job_id, prompt_override)
 
         local_clip = generate_with_veo(
             prompt,
@@ -262,19 +302,230 @@ def main():
 
     except Exception as e:
         logging.exception("Generation failed")
+        # a failed statement leaves the transaction aborted
+        conn.rollback()
         mark_failed(conn, job_id, str(e))
 
     finally:
-        if local_clip:
-            try:
-                os.remove(local_clip)
-            except OSError:
-                pass
-        for path in local_reference_files:
+        leases.release(job_id)
+        _remove_files([local_clip, *local_reference_files])
+
+
+# ---------------------------
+# Serve Mode
+# ---------------------------
+
+def _subscription_path(subscription: str) -> str:
+    if subscription.startswith("projects/"):
+        return subscription
+    return f"projects/{os.environ['GOOGLE_CLOUD_PROJECT']}/subscriptions/{subscription}"
+
+
+def _with_conn(pool: ThreadedConnectionPool, fn, *args):
+    conn = pool.getconn()
+    ok = False
+    try:
+        result = fn(conn, *args)
+        ok = True
+        return result
+    finally:
+        # a connection that just failed is not trusted with the next job
+        pool.putconn(conn, close=not ok or bool(conn.closed))
+
+
+async def complete_job(
+    poller: VeoPoller,
+    pool: ThreadedConnectionPool,
+    leases: LeaseKeeper,
+    job_id: int,
+    prompt: str,
+    local_reference_files: list[str],
+) -> bool:
+    """Waits for the generation, uploads it and records the outcome.
+    Returns whether the outcome was recorded."""
+    local_clip: str | None = None
+    try:
+        try:
+            local_clip = await poller.generate(prompt, local_reference_files)
+            preview_path = await asyncio.to_thread(upload_to_gcs, job_id, local_clip)
+        except Exception as e:
+            logging.exception(f"Generation failed for job {job_id}")
+            await asyncio.to_thread(_with_conn, pool, mark_failed, job_id, str(e))
+        else:
+            await asyncio.to_thread(_with_conn, pool, mark_success, job_id, preview_path)
+            logging.info(f"Job {job_id} completed")
+        return True
+    except Exception:
+        # the lease runs out and the reaper requeues the job
+        logging.exception(f"Could not record the outcome of job {job_id}, leaving it for the reaper")
+        return False
+    finally:
+        leases.release(job_id)
+        _remove_files([local_clip, *local_reference_files])
+
+
+def serve(subscription: str, concurrency: int) -> None:
+    """Pulls dispatch messages and keeps up to ``concurrency`` jobs in flight.
+
+    A message's callback only prepares its job (claim, fetch input,
+    download references) and hands the generation to a single event loop
+    that polls every outstanding Veo operation, so a few threads drive
+    dozens of generations. Clients and DB connections stay open across
+    jobs. A message is acked once its job's outcome is recorded, or at once
+    when the job is already claimed; it is nacked when the outcome could not
+    be written, and the redelivery is a no-op until the reaper requeues the
+    job after its lease expires. Every serving worker also runs the reaper.
+    """
+    from google.cloud import pubsub_v1
+
+    if not subscription:
+        raise RuntimeError("Missing subscription: pass --subscription or set PUBSUB_SUBSCRIPTION")
+
+    # every job holds at most one connection at a time
+    pool = ThreadedConnectionPool(1, concurrency, DATABASE_URL)
+    # pay client setup before the first message, not during it
+    get_storage_client()
+    get_veo_client()
+    poller = get_veo_poller()
+    veo_loop = EventLoopThread()
+    leases = LeaseKeeper()
+    leases.start()
+    reaper = LeaseReaper() if GENERATION_TOPIC else None
+    if reaper is None:
+        logging.warning("GCP_PUBSUB_VIDEO_GEN_TOPIC is not set, not reaping expired leases")
+    else:
+        reaper.start()
+    in_flight: set[Future] = set()
+    in_flight_lock = threading.Lock()
+
+    def settle(message, future: Future) -> None:
+        with in_flight_lock:
+            in_flight.discard(future)
+        if not future.cancelled() and future.exception() is None and future.result():
+            message.ack()
+        else:
+            message.nack()
+
+    def handle(message) -> None:
+        try:
+            payload = json.loads(message.data.decode("utf-8"))
+            job_id = int(payload["job_id"])
+        except (ValueError, KeyError, TypeError):
+            logging.error(f"Dropping malformed message {message.message_id}: {message.data!r}")
+            message.ack()
+            return
+
+        try:
+            claimed = _with_conn(pool, claim, leases, job_id)
+        except Exception:
+            logging.exception(f"Could not claim job {job_id}, leaving it for redelivery")
+            message.nack()
+            return
+        if not claimed:
+            message.ack()
+            return
+
+        try:
+            prompt, local_reference_files = _with_conn(pool, prepare_job, job_id, payload.get("prompt"))
+        except Exception as e:
+            logging.exception(f"Generation failed for job {job_id}")
             try:
-                os.remove(path)
-            except OSError:
-                pass
+                _with_conn(pool, mark_failed, job_id, str(e))
+            except Exception:
+                # the job stays claimed; the reaper requeues it once the lease expires
+                logging.exception(f"Could not record the outcome of job {job_id}, leaving it for the reaper")
+                message.nack()
+                return
+            finally:
+                leases.release(job_id)
+            message.ack()
+            return
+
+        future = veo_loop.submit(complete_job(poller, pool, leases, job_id, prompt, local_reference_files))
+        with in_flight_lock:
+            in_flight.add(future)
+        future.add_done_callback(lambda f: settle(message, f))
+
+    subscriber = pubsub_v1.SubscriberClient()
+    streaming_pull = subscriber.subscribe(
+        _subscription_path(subscription),
+        callback=handle,
+        flow_control=pubsub_v1.types.FlowControl(
+            max_messages=concurrency,
+            max_lease_duration=WORKER_MAX_LEASE_SECONDS,
+        ),
+        scheduler=pubsub_v1.subscriber.scheduler.ThreadScheduler(
+            ThreadPoolExecutor(
+                max_workers=min(WORKER_PREPARE_THREADS, concurrency),
+                thread_name_prefix="job",
+            )
+        ),
+        await_callbacks_on_shutdown=True,
+    )
+
+    def stop(signum, frame):
+        logging.info("Stopping: no new messages, waiting for running jobs")
+        streaming_pull.cancel()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logging.info(f"Serving {subscription} with up to {concurrency} jobs in flight")
+    with subscriber:
+        try:
+            streaming_pull.result()
+        finally:
+            # let started generations finish and record their outcome; their
+            # acks are lost with the stream, so Pub/Sub will redeliver them,
+            # finding the jobs already done
+            with in_flight_lock:
+                pending = list(in_flight)
+            wait(pending)
+            if reaper is not None:
+                reaper.stop()
+            leases.stop()
+            veo_loop.stop()
+            pool.closeall()
+
+
+# ---------------------------
+# Main Entry
+# ---------------------------
+
+def main():
+    # 1. Setup the parser
+    parser = argparse.ArgumentParser(description="Cloud Run Job Worker")
+
+    # 2. Define your expected arguments
+    # argparse handles the "--key=value" or "--key value" format automatically
+    parser.add_argument("--job_id", type=int, help="The ID of the job")
+    parser.add_argument("--prompt", type=str, help="The text prompt for generation")
+
+    parser.add_argument("--serve", action="store_true", help="Pull jobs from a subscription until stopped")
+    parser.add_argument("--subscription", default=PUBSUB_SUBSCRIPTION, help="Subscription for --serve")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="Jobs run at once with --serve")
+
+    # 3. Parse the arguments from sys.argv
+    args, unknown = parser.parse_known_args()
+
+    if args.serve:
+        serve(args.subscription, args.concurrency)
+        return
+
+    logging.info(f"Received job_id: {args.job_id}")
+    logging.info(f"Received prompt: {args.prompt}")
+
+    job_id = args.job_id
+    if not job_id:
+        raise RuntimeError("Missing required --job_id")
+
+    conn = get_conn()
+    leases = LeaseKeeper()
+    leases.start()
+    try:
+        run_job(conn, leases, job_id, args.prompt)
+    finally:
+        leases.stop()
         conn.close()
 
 
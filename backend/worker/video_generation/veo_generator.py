@@ -0,0 +1,218 @@
+import os
+import asyncio
+import logging
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+VEO_MODEL = "veo-3.1-generate-preview"
+
+
+# ---------------------------
+# Veo Clients
+# ---------------------------
+
+class VeoClient(ABC):
+    """The three Veo calls the poller needs; operations only have to expose
+    ``done``, ``error`` and ``response.generated_videos``."""
+
+    @abstractmethod
+    async def start(self, prompt: str, reference_local_files: list[str] | None = None):
+        pass
+
+    @abstractmethod
+    async def refresh(self, operation):
+        pass
+
+    @abstractmethod
+    async def save(self, video, local_path: str) -> None:
+        pass
+
+
+class GenaiVeoClient(VeoClient):
+    def __init__(self, client):
+        # a google.genai.Client; its .aio side is used for start and polling
+        self.client = client
+
+    @staticmethod
+    def _reference_images(reference_local_files: list[str] | None):
+        from google.genai import types
+
+        if not reference_local_files:
+            return None
+        return [
+            types.VideoGenerationReferenceImage(
+                image=types.Image.from_file(location=local_path),
+                reference_type=types.VideoGenerationReferenceType.ASSET,
+            )
+            for local_path in reference_local_files
+        ]
+
+    async def start(self, prompt, reference_local_files=None):
+        from google.genai import types
+
+        config_kwargs = {
+            "aspect_ratio": "9:16",  # mobile vertical
+            # "resolution": "720p",
+            # "duration_seconds": duration_seconds,
+            # "person_generation": "allow_all",
+        }
+        reference_images = self._reference_images(reference_local_files)
+        if reference_images:
+            config_kwargs["reference_images"] = reference_images
+
+        return await self.client.aio.models.generate_videos(
+            model=VEO_MODEL,
+            prompt=prompt,
+            config=types.GenerateVideosConfig(**config_kwargs),
+        )
+
+    async def refresh(self, operation):
+        return await self.client.aio.operations.get(operation)
+
+    async def save(self, video, local_path):
+        def download():
+            self.client.files.download(file=video.video)
+            video.video.save(local_path)
+
+        await asyncio.to_thread(download)
+
+
+class FakeVeoClient(VeoClient):
+    """Offline stand-in: every operation finishes after ``polls_until_done``
+    refreshes and "generates" ``video_bytes``; prompts containing
+    ``fail_marker`` finish with an error."""
+
+    def __init__(self, polls_until_done: int = 3, video_bytes: bytes = b"fake mp4", fail_marker: str = "[fail]"):
+        self.polls_until_done = polls_until_done
+        self.video_bytes = video_bytes
+        self.fail_marker = fail_marker
+        self.started = 0
+        self.refreshes = 0
+
+    async def start(self, prompt, reference_local_files=None):
+        self.started += 1
+        return SimpleNamespace(
+            name=f"operations/fake-{self.started}",
+            prompt=prompt,
+            polls=0,
+            done=False,
+            error=None,
+            response=None,
+        )
+
+    async def refresh(self, operation):
+        self.refreshes += 1
+        operation.polls += 1
+        if operation.polls >= self.polls_until_done:
+            operation.done = True
+            if self.fail_marker in operation.prompt:
+                operation.error = {"message": "fake generation failure"}
+            else:
+                operation.response = SimpleNamespace(generated_videos=[SimpleNamespace(video=self.video_bytes)])
+        return operation
+
+    async def save(self, video, local_path):
+        with open(local_path, "wb") as f:
+            f.write(video.video)
+
+
+# ---------------------------
+# Poller
+# ---------------------------
+
+class VeoPoller:
+    """Drives any number of Veo operations from one event loop.
+
+    Each operation is polled after ``initial_interval`` seconds, then ever
+    less often (times ``backoff``, up to ``max_interval``): a generation
+    takes a minute or more, so early polls are cheap insurance and later
+    ones mostly wasted. At most ``max_concurrent_polls`` refresh calls are in
+    flight at once, however many operations are tracked.
+    """
+
+    def __init__(
+        self,
+        client: VeoClient,
+        initial_interval: float = 2.0,
+        max_interval: float = 15.0,
+        backoff: float = 1.5,
+        timeout: float = 900.0,
+        max_concurrent_polls: int = 10,
+    ):
+        self.client = client
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_concurrent_polls = max_concurrent_polls
+        self.active = 0
+        self._polls: asyncio.Semaphore | None = None
+
+    def _poll_slots(self) -> asyncio.Semaphore:
+        # created lazily so it binds to the loop that actually runs the poller
+        if self._polls is None:
+            self._polls = asyncio.Semaphore(self.max_concurrent_polls)
+        return self._polls
+
+    async def wait(self, operation):
+        """Polls ``operation`` until it is done and returns it."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        interval = self.initial_interval
+        while not operation.done:
+            if loop.time() + interval > deadline:
+                raise TimeoutError(f"Veo operation did not finish within {self.timeout:g}s")
+            await asyncio.sleep(interval)
+            async with self._poll_slots():
+                operation = await self.client.refresh(operation)
+            interval = min(interval * self.backoff, self.max_interval)
+        return operation
+
+    async def generate(self, prompt: str, reference_local_files: list[str] | None = None) -> str:
+        """Runs one generation to completion and returns the local mp4 path."""
+        normalized_prompt = (prompt or "").strip()
+        if not normalized_prompt:
+            raise RuntimeError("Prompt is empty after trimming whitespace")
+
+        self.active += 1
+        try:
+            operation = await self.client.start(normalized_prompt, reference_local_files)
+            logging.info(f"Veo operation started ({self.active} in flight)")
+            operation = await self.wait(operation)
+        finally:
+            self.active -= 1
+
+        if operation.error:
+            raise RuntimeError(f"Veo failed: {operation.error}")
+
+        if not operation.response or not operation.response.generated_videos:
+            raise RuntimeError("Veo returned empty response")
+
+        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
+            local_path = tmp.name
+        try:
+            await self.client.save(operation.response.generated_videos[0], local_path)
+        except Exception:
+            os.remove(local_path)
+            raise
+        return local_path
+
+
+class EventLoopThread:
+    """An event loop on a daemon thread, for submitting coroutines from
+    synchronous code (e.g. Pub/Sub callbacks)."""
+
+    def __init__(self, name: str = "veo-poller"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
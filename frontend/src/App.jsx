@@ -5,7 +5,7 @@ import FeedView from './views/FeedView.jsx';
 import CreateView from './views/CreateView.jsx';
 import ProfileView from './views/ProfileView.jsx';
 import { api, googleLoginUrl, uploadProfilePic } from './services/api.js';
-import { addNestedComment, buildCommentTree } from './utils/comments.js';
+import { addNestedComment, appendComments, appendReplies } from './utils/comments.js';
 
 const buildMessage = (role, text) => ({
   id: `${role}-${Date.now()}-${Math.random()}`,
@@ -52,6 +52,10 @@ export default function App() {
   const [commentDrafts, setCommentDrafts] = useState({});
   const [replyTargets, setReplyTargets] = useState({});
   const [commentsByVideo, setCommentsByVideo] = useState({});
+  // next_page_token of each video's comment threads, null once all are loaded
+  const [commentPagesByVideo, setCommentPagesByVideo] = useState({});
+  // comment pages being fetched, so repeated clicks do not request them twice
+  const commentLoadsRef = useRef(new Set());
 
   const [messages, setMessages] = useState(() => buildInitialMessages());
   const [prompt, setPrompt] = useState('');
@@ -66,6 +70,8 @@ export default function App() {
   const [following, setFollowing] = useState([]);
   const [followedUsers, setFollowedUsers] = useState({});
   const [ownerIdByVideo, setOwnerIdByVideo] = useState({});
+  // videos whose owner was already requested, resolved or not
+  const ownerRequestedRef = useRef(new Set());
 
   const [notice, setNotice] = useState('');
   const [error, setError] = useState('');
@@ -130,10 +136,11 @@ export default function App() {
         liked: Boolean(item.is_liked_by_user),
         comments_count: item.comments_count ?? 0,
         comments: commentsByVideo[item.video_id] || [],
+        hasMoreComments: Boolean(commentPagesByVideo[item.video_id]),
         isFollowing
       };
     }),
-  [feedItems, commentsByVideo, ownerIdByVideo, followedUsers, followedUsernames]);
+  [feedItems, commentsByVideo, commentPagesByVideo, ownerIdByVideo, followedUsers, followedUsernames]);
 
   const creatorIndex = useMemo(() => {
     const map = new Map();
@@ -239,6 +246,7 @@ export default function App() {
     let cancelled = false;
     let reconnectTimer;
     const controller = new AbortController();
+    let lastEventId = null;
 
     const baseUrl = API_BASE || `${window.location.protocol}//${window.location.host}`;
     const eventsUrl = `${baseUrl.replace(/\/+$/, '')}/events/video-generation?token=${encodeURIComponent(token)}`;
@@ -286,10 +294,13 @@ export default function App() {
 
     const connect = async () => {
       try {
+        const headers = { Accept: 'text/event-stream' };
+        if (lastEventId) {
+          headers['Last-Event-ID'] = lastEventId;
+        }
+
         const response = await fetch(eventsUrl, {
-          headers: {
-            Accept: 'text/event-stream'
-          },
+          headers,
           signal: controller.signal
         });
 
@@ -317,29 +328,46 @@ export default function App() {
             buffer = buffer.slice(boundaryIndex + 2);
             if (!rawEvent) continue;
 
-            const dataLines = rawEvent
-              .split('\n')
-              .filter((line) => line.startsWith('data:'))
-              .map((line) => line.slice(5).trim());
+            let eventType = 'message';
+            const dataLines = [];
+            rawEvent.split('\n').forEach((line) => {
+              if (line.startsWith('event:')) eventType = line.slice(6).trim();
+              else if (line.startsWith('id:')) lastEventId = line.slice(3).trim();
+              else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+            });
 
             if (dataLines.length === 0) continue;
 
             try {
-              const jobs = JSON.parse(dataLines.join('\n'));
-              if (!Array.isArray(jobs)) continue;
+              const data = JSON.parse(dataLines.join('\n'));
 
-              if (!cancelled) {
-                setGenerationJobs(jobs);
-              }
+              if (eventType === 'snapshot') {
+                if (!Array.isArray(data)) continue;
+
+                if (!cancelled) {
+                  setGenerationJobs(data);
+                }
 
-              if (jobs.length === 0) continue;
+                if (data.length === 0) continue;
 
-              const currentId = latestGeneration?.id;
-              const job = currentId
-                ? jobs.find((item) => item.id === currentId) || jobs[0]
-                : jobs[0];
+                const currentId = latestGeneration?.id;
+                const job = currentId
+                  ? data.find((item) => item.id === currentId) || data[0]
+                  : data[0];
 
-              handleGenerationUpdate(job);
+                handleGenerationUpdate(job);
+              } else if (eventType === 'job') {
+                if (!data?.id) continue;
+
+                if (!cancelled) {
+                  setGenerationJobs((prev) => [data, ...prev.filter((item) => item.id !== data.id)]);
+                }
+
+                const currentId = latestGeneration?.id;
+                if (!currentId || currentId === data.id) {
+                  handleGenerationUpdate(data);
+                }
+              }
             } catch {
               // ignore parse errors
             }
@@ -370,6 +398,7 @@ export default function App() {
       setFollowing([]);
       setFollowedUsers({});
       setOwnerIdByVideo({});
+      ownerRequestedRef.current = new Set();
       return;
     }
 
@@ -379,21 +408,37 @@ export default function App() {
   }, [token]);
 
   useEffect(() => {
+    const requested = ownerRequestedRef.current;
     const missing = feedItems
       .filter((item) => !(item.owner_id || ownerIdByVideo[item.video_id]))
-      .map((item) => item.video_id);
-    if (missing.length === 0) return;
+      .map((item) => item.video_id)
+      .filter((videoId) => !requested.has(videoId));
+    if (missing.length === 0 || !token) return;
 
     let cancelled = false;
 
     const resolveOwners = async () => {
-      for (const videoId of missing) {
+      // one bulk request per 100 videos instead of one per video; videos the
+      // response leaves out (deleted, not ready) are not asked for again
+      for (let i = 0; i < missing.length; i += 100) {
+        const chunk = missing.slice(i, i + 100);
+        chunk.forEach((videoId) => requested.add(videoId));
         try {
-          const data = await api.getVideo(videoId);
-          if (!cancelled && data?.owner_id) {
-            setOwnerIdByVideo((prev) => ({ ...prev, [videoId]: data.owner_id }));
+          const data = await api.getInteractionState(token, chunk);
+          const owners = {};
+          for (const item of data?.items || []) {
+            owners[item.video_id] = item.owner_id;
+          }
+          // kept even when this run was superseded: the next run skips
+          // these ids as already requested
+          if (Object.keys(owners).length > 0) {
+            setOwnerIdByVideo((prev) => ({ ...prev, ...owners }));
           }
+          // later chunks are left to the run that superseded this one
+          if (cancelled) return;
         } catch (err) {
+          // retried when the feed changes
+          chunk.forEach((videoId) => requested.delete(videoId));
           if (!cancelled) setError(err.message);
         }
       }
@@ -404,7 +449,7 @@ export default function App() {
     return () => {
       cancelled = true;
     };
-  }, [feedItems, ownerIdByVideo]);
+  }, [feedItems, ownerIdByVideo, token]);
 
   useEffect(() => {
     if (!user?.id) return;
@@ -645,25 +690,77 @@ export default function App() {
     }
   }
 
-  function normalizeComment(comment, index) {
+  function normalizeComment(comment, index, moreReplies = false) {
     return {
       id: comment.id || comment.comment_id || `${comment.created_at || 'comment'}-${index}`,
       text: comment.content || comment.comment_text || '',
-      parentId: comment.parent_comment_id || null
+      parentId: comment.parent_comment_id || null,
+      // see appendReplies; replies of replies are never inlined, so whether
+      // a reply has any is only known once they are fetched
+      moreReplies
     };
   }
 
-  async function loadComments(videoId) {
+  function normalizeThread(thread, index) {
+    const moreReplies = thread.has_more_replies ? thread.next_replies_token || true : false;
+    return {
+      ...normalizeComment(thread, index, moreReplies),
+      replies: (thread.replies || []).map((reply, idx) => ({
+        ...normalizeComment(reply, idx, true),
+        replies: []
+      }))
+    };
+  }
+
+  async function withCommentLoad(key, load) {
+    if (commentLoadsRef.current.has(key)) return;
+    commentLoadsRef.current.add(key);
     try {
-      const data = await api.getComments(videoId);
-      const normalized = (data || []).map(normalizeComment);
-      const tree = buildCommentTree(normalized);
-      setCommentsByVideo((prev) => ({ ...prev, [videoId]: tree }));
+      await load();
     } catch (err) {
       setError(err.message);
+    } finally {
+      commentLoadsRef.current.delete(key);
     }
   }
 
+  // the first page replaces what is shown; later pages (pageToken) append
+  async function loadComments(videoId, pageToken = null) {
+    await withCommentLoad(`video:${videoId}`, async () => {
+      // threads in creation order, each with its first few replies inlined
+      const data = await api.getComments(videoId, pageToken);
+      const threads = (data?.items || []).map(normalizeThread);
+      setCommentsByVideo((prev) => ({
+        ...prev,
+        [videoId]: pageToken ? appendComments(prev[videoId] || [], threads) : threads
+      }));
+      setCommentPagesByVideo((prev) => ({ ...prev, [videoId]: data?.next_page_token || null }));
+    });
+  }
+
+  async function loadMoreComments(videoId) {
+    const pageToken = commentPagesByVideo[videoId];
+    if (pageToken) {
+      await loadComments(videoId, pageToken);
+    }
+  }
+
+  async function loadMoreReplies(videoId, comment) {
+    if (!comment.moreReplies) return;
+    const pageToken = typeof comment.moreReplies === 'string' ? comment.moreReplies : null;
+    await withCommentLoad(`replies:${comment.id}`, async () => {
+      const data = await api.getReplies(comment.id, pageToken);
+      const replies = (data?.items || []).map((reply, idx) => ({
+        ...normalizeComment(reply, idx, true),
+        replies: []
+      }));
+      setCommentsByVideo((prev) => ({
+        ...prev,
+        [videoId]: appendReplies(prev[videoId] || [], comment.id, replies, data?.next_page_token || false)
+      }));
+    });
+  }
+
   async function submitComment(videoId) {
     if (!token) {
       setError('Sign in to comment.');
@@ -930,6 +1027,8 @@ export default function App() {
           replyTargets={replyTargets}
           onToggleLike={toggleLike}
           onToggleComments={toggleComments}
+          onLoadMoreComments={loadMoreComments}
+          onLoadMoreReplies={loadMoreReplies}
           onToggleReply={toggleReplyTarget}
           onDraftChange={updateDraft}
           onSubmitComment={submitComment}
@@ -1,6 +1,8 @@
 import React from 'react';
 
-export default function CommentItem({ comment, onReply, depth = 0 }) {
+export default function CommentItem({ comment, onReply, onLoadMoreReplies, depth = 0 }) {
+  const hasReplies = comment.replies && comment.replies.length > 0;
+
   return (
     <li className={`comment-item depth-${depth}`}>
       <div className="comment-text">{comment.text}</div>
@@ -11,18 +13,28 @@ export default function CommentItem({ comment, onReply, depth = 0 }) {
       >
         Reply
       </button>
-      {comment.replies && comment.replies.length > 0 && (
+      {hasReplies && (
         <ul className="comment-list nested">
           {comment.replies.map((child) => (
             <CommentItem
               key={child.id}
               comment={child}
               onReply={onReply}
+              onLoadMoreReplies={onLoadMoreReplies}
               depth={Math.min(depth + 1, 3)}
             />
           ))}
         </ul>
       )}
+      {comment.moreReplies && (
+        <button
+          type="button"
+          className="comment-more"
+          onClick={() => onLoadMoreReplies(comment)}
+        >
+          {hasReplies ? 'Show more replies' : 'View replies'}
+        </button>
+      )}
     </li>
   );
 }
@@ -8,7 +8,9 @@ export default function CommentsPanel({
   replyTarget,
   onToggleReply,
   onDraftChange,
-  onSubmit
+  onSubmit,
+  onLoadMore,
+  onLoadMoreReplies
 }) {
   const comments = video.comments || [];
 
@@ -47,9 +49,15 @@ export default function CommentsPanel({
             key={comment.id}
             comment={comment}
             onReply={onToggleReply}
+            onLoadMoreReplies={onLoadMoreReplies}
           />
         ))}
       </ul>
+      {video.hasMoreComments && (
+        <button type="button" className="comment-more" onClick={onLoadMore}>
+          Load more comments
+        </button>
+      )}
     </div>
   );
 }
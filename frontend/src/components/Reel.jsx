@@ -7,6 +7,8 @@ export default function Reel({
   isCommentsOpen,
   onLike,
   onComments,
+  onLoadMoreComments,
+  onLoadMoreReplies,
   onFollow,
   isFollowing,
   commentDraft,
@@ -63,6 +65,8 @@ export default function Reel({
           onToggleReply={onToggleReply}
           onDraftChange={onDraftChange}
           onSubmit={onSubmitComment}
+          onLoadMore={onLoadMoreComments}
+          onLoadMoreReplies={onLoadMoreReplies}
         />
       </div>
     </section>
@@ -88,11 +88,26 @@ export const api = {
   getVideo: (videoId) => apiRequest(`/videos/${videoId}`),
   deleteVideo: (token, videoId) => apiRequest(`/videos/${videoId}`, { method: "DELETE", token }),
   getMyVideos: (token) => apiRequest("/videos/user-videos", { token }),
-  getFeed: (token) => apiRequest("/feed/", { token }),
+  getFeed: (token, pageToken) =>
+    apiRequest(pageToken ? `/feed/?page_token=${encodeURIComponent(pageToken)}` : "/feed/", { token }),
   likeVideo: (token, videoId) => apiRequest(`/interactions/${videoId}/like`, { method: "POST", token }),
   unlikeVideo: (token, videoId) => apiRequest(`/interactions/${videoId}/like`, { method: "DELETE", token }),
   postComment: (token, videoId, payload) => apiRequest(`/interactions/${videoId}/comment`, { method: "POST", token, body: payload }),
-  getComments: (videoId) => apiRequest(`/interactions/${videoId}/comments`),
+  getInteractionState: (token, videoIds) =>
+    apiRequest(`/interactions/state?${videoIds.map((id) => `video_ids=${encodeURIComponent(id)}`).join("&")}`, { token }),
+  getComments: (videoId, pageToken, limit) => {
+    const params = new URLSearchParams();
+    if (pageToken) params.set("page_token", pageToken);
+    if (limit) params.set("limit", limit);
+    const query = params.toString();
+    return apiRequest(`/interactions/${videoId}/comments${query ? `?${query}` : ""}`);
+  },
+  getReplies: (commentId, pageToken) =>
+    apiRequest(
+      pageToken
+        ? `/interactions/comment/${commentId}/replies?page_token=${encodeURIComponent(pageToken)}`
+        : `/interactions/comment/${commentId}/replies`
+    ),
   deleteComment: (token, commentId) => apiRequest(`/interactions/comment/${commentId}`, { method: "DELETE", token }),
   followUser: (token, userId) => apiRequest(`/users/${userId}/follow`, { method: "POST", token }),
   unfollowUser: (token, userId) => apiRequest(`/users/${userId}/follow`, { method: "DELETE", token }),
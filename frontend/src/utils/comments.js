@@ -28,22 +28,32 @@ export const addNestedComment = (comments, targetId, newComment) => {
   });
 };
 
-export const buildCommentTree = (flatComments = []) => {
-  const map = new Map();
-  const roots = [];
+// Appends a later page of comments, skipping ones already shown (e.g. just
+// posted from this client).
+export const appendComments = (comments = [], page = []) => {
+  const seen = new Set(comments.map((comment) => comment.id));
+  return [...comments, ...page.filter((comment) => !seen.has(comment.id))];
+};
 
-  flatComments.forEach((comment) => {
-    map.set(comment.id, { ...comment, replies: [] });
-  });
+// Appends a page of replies under ``targetId`` and records how to fetch the
+// next one: ``moreReplies`` is the page token to continue from, true to
+// start from the first reply, or false when there are no more.
+export const appendReplies = (comments, targetId, replies, moreReplies) =>
+  comments.map((comment) => {
+    if (comment.id === targetId) {
+      return {
+        ...comment,
+        replies: appendComments(comment.replies || [], replies),
+        moreReplies
+      };
+    }
 
-  flatComments.forEach((comment) => {
-    const node = map.get(comment.id);
-    if (comment.parentId && map.has(comment.parentId)) {
-      map.get(comment.parentId).replies.push(node);
-    } else {
-      roots.push(node);
+    if (comment.replies && comment.replies.length) {
+      return {
+        ...comment,
+        replies: appendReplies(comment.replies, targetId, replies, moreReplies)
+      };
     }
-  });
 
-  return roots;
-};
+    return comment;
+  });
@@ -8,6 +8,8 @@ export default function FeedView({
   replyTargets,
   onToggleLike,
   onToggleComments,
+  onLoadMoreComments,
+  onLoadMoreReplies,
   onToggleReply,
   onDraftChange,
   onSubmitComment,
@@ -61,6 +63,8 @@ export default function FeedView({
           isCommentsOpen={openCommentsId === video.id}
           onLike={() => onToggleLike(video.id)}
           onComments={() => onToggleComments(video.id)}
+          onLoadMoreComments={() => onLoadMoreComments(video.id)}
+          onLoadMoreReplies={(comment) => onLoadMoreReplies(video.id, comment)}
           commentDraft={commentDrafts[video.id] || ''}
           replyTarget={replyTargets[video.id] || null}
           onToggleReply={(commentId) => onToggleReply(video.id, commentId)}